@@ -598,7 +598,7 @@ class API:
         https://celery.school/custom-celery-task-states
 
         NOTE: This code, as well as its integration, is tested in
-              `PostEndpointTests.test_task_id_returned_once_existing`.
+              `TestPostEndpoints.test_task_id_returned_once_existing`.
 
         Arguments:
         ----------
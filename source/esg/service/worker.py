@@ -17,9 +17,14 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
+from functools import lru_cache
 import os
 from pathlib import Path
 
+from pydantic import BaseModel
+from pydantic import RootModel
+from pydantic import TypeAdapter
+
 # To prevent tests from failing if only parts of the package are used.
 try:
     from celery import Celery
@@ -120,8 +125,13 @@ def celery_app_from_environ():
         )
 
 
+@lru_cache(maxsize=128)
 def compute_request_input_model(RequestArguments, FittedParameters=None):
     """
+    Results are cached, i.e. calling this function with the same models
+    returns the identical `RequestInput` model. This saves rebuilding the
+    model for every task executed by the worker.
+
     Arguments:
     ----------
     RequestArguments : pydantic model
@@ -151,8 +161,11 @@ def compute_request_input_model(RequestArguments, FittedParameters=None):
     return RequestInput
 
 
+@lru_cache(maxsize=128)
 def compute_fit_parameters_input_model(FitParameterArguments, Observations):
     """
+    Like `compute_request_input_model`, the results are cached.
+
     Arguments:
     ----------
     FitParameterArguments : pydantic model
@@ -176,8 +189,21 @@ def compute_fit_parameters_input_model(FitParameterArguments, Observations):
     return FitParametersInput
 
 
+@lru_cache(maxsize=128)
+def _type_adapter(DataModel):
+    """
+    Returns a (cached) `TypeAdapter` for data models that are not pydantic
+    models, e.g. `TypedDict`s. Creating the adapter is expensive.
+    """
+    return TypeAdapter(DataModel)
+
+
 def execute_payload(
-    input_data_json, InputDataModel, payload_function, OutputDataModel
+    input_data_json,
+    InputDataModel,
+    payload_function,
+    OutputDataModel,
+    validate_output=True,
 ):
     """
     Invoke the payload function and manage JSON de-/serialization.
@@ -188,16 +214,29 @@ def execute_payload(
 
     Arguments:
     ----------
-    input_data_json : str
+    input_data_json : str or bytes
         The input data for `payload_function`, not parsed yet.
-    InputDataModel : Pydantic model
+    InputDataModel : Pydantic model or TypedDict
         The data model used to parse Python data from `input_data_json`.
+        A `TypedDict` is validated with a `TypeAdapter`, which is faster
+        for flat data and provides a dict to `payload_function`. NOTE:
+        pydantic requires `typing_extensions.TypedDict` instead of
+        `typing.TypedDict` on Python < 3.12.
     payload_function : function
         This the forecasting or optimization code that should be executed
         by the worker.
-    OutputDataModel : Pydantic model
+    OutputDataModel : Pydantic model or TypedDict
         The data model used to serialize whatever is returned by
         `payload_function`.
+    validate_output : bool
+        If `False` the output of `payload_function` is not validated
+        against `OutputDataModel` but used directly via `model_construct`.
+        This is faster but only safe if `payload_function` is trusted to
+        return data matching `OutputDataModel`. Note that nested models
+        are not rebuilt in this case, i.e. these are serialized as
+        returned, e.g. as dicts. Instances of `OutputDataModel` are
+        always used as they are. For a `TypedDict` the output is
+        serialized without validation.
 
     Returns:
     --------
@@ -214,11 +253,34 @@ def execute_payload(
           actually a celery task, in which case we could submit all jobs at
           once and collect the results.
     """
-    input_data = InputDataModel.model_validate_json(input_data_json)
+    if issubclass(InputDataModel, BaseModel):
+        input_data = InputDataModel.model_validate_json(input_data_json)
+    else:
+        input_adapter = _type_adapter(InputDataModel)
+        input_data = input_adapter.validate_json(input_data_json)
+
     output_data = payload_function(input_data)
-    output_data_json = OutputDataModel.model_validate(
-        output_data
-    ).model_dump_json()
+
+    if not issubclass(OutputDataModel, BaseModel):
+        output_adapter = _type_adapter(OutputDataModel)
+        if validate_output:
+            output_data = output_adapter.validate_python(output_data)
+        output_data_json = output_adapter.dump_json(output_data).decode()
+        return output_data_json
+
+    if isinstance(output_data, OutputDataModel):
+        output_data_obj = output_data
+    elif validate_output:
+        output_data_obj = OutputDataModel.model_validate(output_data)
+    elif issubclass(OutputDataModel, RootModel):
+        output_data_obj = OutputDataModel.model_construct(output_data)
+    else:
+        output_data_obj = OutputDataModel.model_construct(**output_data)
+    # Unvalidated data may not match the types of the model, e.g. nested
+    # models are still dicts. This is expected and not worth a warning.
+    output_data_json = output_data_obj.model_dump_json(
+        warnings=validate_output
+    )
     return output_data_json
 
 
@@ -234,7 +296,7 @@ def invoke_handle_request(
 
     Arguments:
     ----------
-    input_data_json : str
+    input_data_json : str or bytes
         The input data for `handle_request_function`, not parsed yet.
     RequestArguments : pydantic model
         A model defining the structure of the  arguments that are required
@@ -278,7 +340,7 @@ def invoke_fit_parameters(
 
     Arguments:
     ----------
-    input_data_json : str
+    input_data_json : str or bytes
         The input data for `handle_request_function`, not parsed yet.
     FitParameterArguments : pydantic model
         A model defining the structure of the  arguments that are required
@@ -439,9 +439,8 @@ class GenericAPITest:
                 endpoint=self.endpoint,
                 InputModel=self.InputDataModel,
             )
-
-            # Raises if test API is not accessible.
-            client.check_connection()
+            # NOTE: No need to call `check_connection` here, the client does
+            #       this on init and thus raises if the API is not accessible.
 
             # Check no other IDs are stored as this might make the test
             # below pass although it should fail.
@@ -472,9 +471,8 @@ class GenericAPITest:
                 endpoint=self.endpoint,
                 InputModel=self.InputDataModel,
             )
-
-            # Raises if test API is not accessible.
-            client.check_connection()
+            # NOTE: No need to call `check_connection` here, the client does
+            #       this on init and thus raises if the API is not accessible.
 
             # Prevents possibly wired errors in tests by making sure no other
             # tasks ids are known to the client.
@@ -21,7 +21,9 @@ SPDX-License-Identifier: Apache-2.0
 
 import json
 
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 import pytest
+from pytest_httpserver import HTTPServer
 
 # Relevant stuff for tests that keycloak returns with default settings for the
 # `realms/<realm>/.well-known/openid-configuration` URL.`
@@ -173,34 +175,99 @@ JWKS_CERTS = {
 # spell-checker: enable
 
 
-@pytest.fixture
-def openid_like_test_idp(httpserver):
+@pytest.fixture(scope="session")
+def rsa_private_key():
     """
-    Provides a valid OIDC configuration matching the test data above.
+    `RSA256_PRIVATE_KEY` as key object.
 
-    This allows testing components that would automatically adapt to the
-    OIDC settings provided under `.well-known`.
+    Passing the loaded key to `jwt.encode` saves parsing the PEM string
+    for every token that is signed in the tests.
+    """
+    return load_pem_private_key(RSA256_PRIVATE_KEY.encode(), password=None)
+
+
+@pytest.fixture(scope="session")
+def invalid_rsa_private_key():
+    """
+    Like `rsa_private_key` but for `INVALID_RSA_PRIVATE_KEY`.
+    """
+    return load_pem_private_key(
+        INVALID_RSA_PRIVATE_KEY.encode(), password=None
+    )
+
+
+def _add_openid_handlers(httpserver, expect_request):
+    """
+    Make `httpserver` serve the OIDC configuration and keys.
+
+    Arguments:
+    ----------
+    httpserver : pytest_httpserver.HTTPServer
+        The server the handlers are registered on.
+    expect_request : callable
+        The method of `httpserver` used to register the handlers, e.g.
+        `httpserver.expect_oneshot_request`.
+
+    Returns:
+    --------
+    issuer : str
+        The issuer URL matching the served configuration.
     """
     realm_url = "/realms/test-atc"
     openid_config_url = f"{realm_url}/.well-known/openid-configuration"
 
     # Handle the request to OpenID Connect discovery endpoint.
     issuer = httpserver.url_for(realm_url)
-    open_id_config = json.loads(
-        OPEN_ID_CONFIGURATION_TEMPLATE.replace("$ISSUER", issuer)
-    )
-    expected_request = httpserver.expect_oneshot_request(
+    open_id_config = json.loads(OPEN_ID_CONFIGURATION_TEMPLATE)
+    jwks_uri_template = open_id_config["jwks_uri"]
+    open_id_config["jwks_uri"] = jwks_uri_template.replace("$ISSUER", issuer)
+    expected_request = expect_request(
         openid_config_url,
     )
     expected_request.respond_with_json(open_id_config)
 
     # Handle request to JWKS endpoint.
-    jwks_uri = json.loads(OPEN_ID_CONFIGURATION_TEMPLATE)["jwks_uri"]
-    jwks_uri = jwks_uri.split("$ISSUER")[-1]
+    jwks_uri = jwks_uri_template.split("$ISSUER")[-1]
     jwks_uri = f"{realm_url}{jwks_uri}"
-    expected_request = httpserver.expect_oneshot_request(
+    expected_request = expect_request(
         jwks_uri,
     )
     expected_request.respond_with_json(JWKS_CERTS)
 
+    return issuer
+
+
+@pytest.fixture
+def openid_like_test_idp(httpserver):
+    """
+    Provides a valid OIDC configuration matching the test data above.
+
+    This allows testing components that would automatically adapt to the
+    OIDC settings provided under `.well-known`.
+    """
+    issuer = _add_openid_handlers(
+        httpserver, httpserver.expect_oneshot_request
+    )
     return httpserver, issuer
+
+
+@pytest.fixture(scope="session")
+def openid_like_test_idp_session():
+    """
+    Like `openid_like_test_idp` but shared by all tests of the session.
+
+    The configuration and keys are served for any number of requests,
+    which saves setting up the handlers for every test. A dedicated
+    server is used, as the `httpserver` fixture of pytest-httpserver
+    removes all handlers after each test. Don't add handlers to the
+    returned server, these would leak into other tests.
+    """
+    httpserver = HTTPServer()
+    httpserver.start()
+
+    issuer = _add_openid_handlers(httpserver, httpserver.expect_request)
+
+    yield httpserver, issuer
+
+    httpserver.clear()
+    httpserver.stop()
@@ -22,12 +22,22 @@ SPDX-License-Identifier: Apache-2.0
 
 import asyncio
 from copy import deepcopy
-from multiprocessing import Process
+import threading
 from uuid import uuid1
-from time import sleep
+from time import monotonic, sleep
 
 import pytest
 
+# To prevent tests from failing if only parts of the package are used.
+try:
+    import uvicorn
+except ModuleNotFoundError:
+    uvicorn = None
+try:
+    from celery import current_app as celery_current_app
+except ModuleNotFoundError:
+    celery_current_app = None
+
 from esg.models.task import TaskId, TaskStatus
 
 
@@ -89,43 +99,131 @@ class TestClassWithFixtures:
 
 class APIInProcess:
     """
-    A helper that executes the API class in a parallel process to
+    A helper that serves the API class in a background thread to
     make testing easier.
+
+    NOTE: The name is kept for backwards compatibility, the API used to
+          run in a dedicated process. A thread avoids forking the whole
+          interpreter and allows a much faster start and shutdown.
+    NOTE: The app is served directly, i.e. `API.run` is not used. Hence
+          the `get_client_addr` patch of the access logs is not applied
+          and `API.close` is not called, the latter is left to the caller
+          which owns the API.
     """
 
-    def __init__(self, api):
+    def __init__(self, api, port=0):
         """
-        Put the `API` instance in a dedicated process.
+        Prepare a uvicorn server for the `API` instance.
 
         Arguments:
         ----------
         api : Initialized API class.
+        port : int
+            The port the API should listen on. The default `0` lets the OS
+            select a free port, which allows several API instances to run
+            in parallel, e.g. with `pytest-xdist`.
+
+        Raises:
+        -------
+        ModuleNotFoundError:
+            If uvicorn is not installed.
         """
+        if uvicorn is None:
+            raise ModuleNotFoundError(
+                "APIInProcess requires uvicorn to work. Consider installing "
+                "the package with the `service` extra."
+            )
         self.api = api
-
-        def _run_API(api):
-            api.run()
-
-        self.process = Process(
-            target=_run_API,
-            kwargs={"api": self.api},
-            daemon=True,
+        self.port = port
+
+        # NOTE: `log_config=None` and `loop="asyncio"` prevent uvicorn from
+        #       reconfiguring the logging and the event loop policy of the
+        #       test process.
+        config = uvicorn.Config(
+            app=self.api.fastapi_app,
+            host="127.0.0.1",
+            port=self.port,
+            log_config=None,
+            loop="asyncio",
         )
+        self.server = uvicorn.Server(config)
+        # celery resolves `AsyncResult` with the current app, which is
+        # thread local. Use the current app of the caller in the server
+        # thread too, else the default app without result backend is used.
+        self.celery_app = None
+        if celery_current_app is not None:
+            self.celery_app = celery_current_app._get_current_object()
+        # Holds whatever terminated the server thread unexpectedly.
+        self.server_exception = None
+        # uvicorn only installs signal handlers if running in the main
+        # thread, i.e. it doesn't interfere with pytest here.
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self):
+        """
+        Target of the server thread.
+        """
+        if self.celery_app is not None:
+            self.celery_app.set_current()
+        try:
+            self.server.run()
+        except BaseException as exc:
+            # E.g. uvicorn raises `SystemExit` on startup failures. Keep it
+            # for the error raised in the test thread.
+            self.server_exception = exc
+
+    def wait_until_started(self, timeout=10.0, interval=0.002):
+        """
+        Block until uvicorn has started and accepts connections.
+
+        Arguments:
+        ----------
+        timeout : float
+            Seconds after which to give up waiting.
+        interval : float
+            Seconds to sleep between two checks.
+
+        Raises:
+        -------
+        RuntimeError:
+            If the server thread has died or the server has not started
+            after `timeout` seconds.
+        """
+        deadline = monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError(
+                    "API server terminated during startup."
+                ) from self.server_exception
+            if monotonic() > deadline:
+                raise RuntimeError(
+                    f"API server not started after {timeout} seconds."
+                )
+            sleep(interval)
 
     def __enter__(self):
-        self.process.start()
-        # Give uvicorn some time to start up.
-        sleep(0.2)
+        self.thread.start()
+        self.wait_until_started()
+        # Read back the port, which is only known at this point if the
+        # OS has selected one.
+        self.port = self.server.servers[0].sockets[0].getsockname()[1]
         # Compute the root path of the API.
         root_path = self.api.fastapi_app.root_path
-        base_url_root = f"http://localhost:8800{root_path}"
+        base_url_root = f"http://127.0.0.1:{self.port}{root_path}"
         return base_url_root
 
     def __exit__(self, *_):
-        self.process.terminate()
-        # XXX: This is super important, as the next test will else
-        #      not be able to spin up the server again.
-        self.process.join()
+        # uvicorn checks this flag periodically and shuts down gracefully,
+        # which releases the port too.
+        self.server.should_exit = True
+        self.thread.join(timeout=2)
+        if self.thread.is_alive():
+            # Skip waiting for open connections and background tasks.
+            self.server.force_exit = True
+            self.thread.join(timeout=5)
+        # NOTE: `api.close()` is not called here on purpose. The API is
+        #       owned by the caller and may be served several times, e.g.
+        #       by `GenericAPITest`.
 
 
 class GenericServiceMock:
@@ -19,7 +19,10 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
+from datetime import timedelta
+
 try:
+    import numpy as np
     import pandas as pd
     from numpy import nan as np_nan
 
@@ -38,6 +41,40 @@ def _check_pandas_available():
         )
 
 
+def _values_as_array(values):
+    """
+    Convert a list of values (see `_Value`) to a float array if possible.
+
+    Values are always floats or `None`, hence the array can be created
+    directly, which spares pandas inferring the dtype element-wise.
+    If all values are `None` the list is returned unchanged, as pandas
+    would create a series or column of dtype object in that case.
+    """
+    if not any(v is not None for v in values):
+        return values
+    return np.fromiter(
+        (np_nan if v is None else v for v in values),
+        dtype=np.float64,
+        count=len(values),
+    )
+
+
+def _index_from_times(times):
+    """
+    Create the index from a list of times (see `_Time`).
+
+    pydantic parses UTC times with its own `TzInfo` implementation,
+    which pandas does not treat as equal to its UTC timezone. Such
+    indexes are hence converted to UTC, which doesn't change the times
+    but lets the index dtype match any other UTC index.
+    """
+    index = pd.Index(times)
+    if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+        if index.tz.utcoffset(None) == timedelta(0):
+            index = index.tz_convert("UTC")
+    return index
+
+
 def series_from_value_message_list(value_message_list):
     """
     Parses a pandas.Series from the content of a `ValueMessageList` instance.
@@ -53,10 +90,13 @@ def series_from_value_message_list(value_message_list):
         A series holding the same information as the value_message_list.
     """
     _check_pandas_available()
-    msg_as_dict = value_message_list.model_dump()
-    times = [m["time"] for m in msg_as_dict]
-    values = [m["value"] for m in msg_as_dict]
-    series = pd.Series(index=times, data=values)
+    # Access the messages directly, `model_dump` would copy everything.
+    messages = value_message_list.root
+    times = [m.time.root for m in messages]
+    values = [None if m.value is None else m.value.root for m in messages]
+    series = pd.Series(
+        index=_index_from_times(times), data=_values_as_array(values)
+    )
 
     return series
 
@@ -101,11 +141,13 @@ def dataframe_from_value_dataframe(value_dataframe):
         The pandas dataframe representation of the data.
     """
     _check_pandas_available()
-    value_dataframe_as_dict = value_dataframe.model_dump()
-    pandas_dataframe = pd.DataFrame(
-        index=value_dataframe_as_dict["times"],
-        data=value_dataframe_as_dict["values"],
-    )
+    # Access the fields directly, `model_dump` would copy everything.
+    times = [t.root for t in value_dataframe.times]
+    data = {}
+    for column_name, column in value_dataframe.values.items():
+        values = [v.root for v in column.root]
+        data[column_name] = _values_as_array(values)
+    pandas_dataframe = pd.DataFrame(index=_index_from_times(times), data=data)
     return pandas_dataframe
 
 
@@ -124,9 +166,16 @@ def value_dataframe_from_dataframe(pandas_dataframe):
         The pydantic object representation of the data.
     """
     _check_pandas_available()
-    pandas_dataframe_non_nan = pandas_dataframe.replace(np_nan, None)
+    # Replace NaNs per column on object arrays. This is done by numpy
+    # and spares the copy of the full dataframe `DataFrame.replace`
+    # would create.
+    values = {}
+    for column_name, column in pandas_dataframe.items():
+        column_values = column.to_numpy(dtype=object, copy=True)
+        column_values[pd.isna(column_values)] = None
+        values[column_name] = column_values.tolist()
     value_dataframe = ValueDataFrame(
-        times=pandas_dataframe_non_nan.index,
-        values=pandas_dataframe_non_nan.to_dict(orient="list"),
+        times=pandas_dataframe.index,
+        values=values,
     )
     return value_dataframe
@@ -53,5 +53,13 @@ setup(
             "numpy",
             "pandas==2.*",
         ],
+        # Only required to run the benchmarks in `tests/perf`.
+        "perf": [
+            "pytest-benchmark",
+        ],
+        # Only required to distribute the tests over several processes.
+        "xdist": [
+            "pytest-xdist",
+        ],
     },
 )
@@ -23,6 +23,8 @@ from unittest.mock import MagicMock
 
 from esg.clients.base import HttpBaseClient
 
+pytestmark = pytest.mark.unit
+
 
 class TestHttpBaseClientInit:
     """
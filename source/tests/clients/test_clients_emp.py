@@ -39,6 +39,8 @@ from generic import GenericCheckConnectionTests
 from generic import GenericGetTests
 from generic import GenericPutTests
 
+pytestmark = pytest.mark.unit
+
 
 class TestEmpClientCheckConnection(GenericCheckConnectionTests):
     """
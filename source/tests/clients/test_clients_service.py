@@ -31,6 +31,8 @@ from esg.models.base import _BaseModel
 from esg.models.base import _RootModel
 from generic import GenericCheckConnectionTests
 
+pytestmark = pytest.mark.unit
+
 
 class TestGenericServiceClientInit(GenericCheckConnectionTests):
     """
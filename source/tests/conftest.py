@@ -50,6 +50,21 @@ pytest_plugins = [
 ]
 
 
+def pytest_collection_modifyitems(config, items):
+    """
+    Skip the benchmarks unless explicitly selected with `-m perf`.
+
+    The benchmarks assert absolute runtimes, which would make the usual
+    test runs flaky on slow machines.
+    """
+    if "perf" in config.getoption("markexpr"):
+        return
+    skip_perf = pytest.mark.skip(reason="benchmark, select with `-m perf`")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip_perf)
+
+
 @pytest.fixture(scope="session")
 def celery_config():
     """
@@ -58,13 +73,19 @@ def celery_config():
     Furthermore, make celery use the the filesystem transport for testing.
     Use a temporary directory for this. This allows communication between
     processes, which is is a preliminary for testing the `service` parts.
+    As the directory is created per session, every pytest-xdist worker
+    uses its own broker and result backend. This includes the control
+    folder holding the exchange tables, which would else default to
+    `./control` and hence be shared by all workers.
     """
     tmp_dir = TemporaryDirectory()
     tmp_dir_path = Path(tmp_dir.name)
     broker_path = tmp_dir_path / "broker"
     results_path = tmp_dir_path / "results"
+    control_path = tmp_dir_path / "control"
     broker_path.mkdir()
     results_path.mkdir()
+    control_path.mkdir()
 
     celery_config = {
         "broker_url": "filesystem://",
@@ -72,8 +93,12 @@ def celery_config():
             "polling_interval": 0.01,
             "data_folder_in": f"{broker_path}/",
             "data_folder_out": f"{broker_path}/",
+            "control_folder": f"{control_path}",
         },
         "result_backend": f"file://{results_path}/",
+        # Tests usually wait for single tasks, prevent that these are held
+        # back by the worker while processing others.
+        "worker_prefetch_multiplier": 1,
     }
     yield celery_config
 
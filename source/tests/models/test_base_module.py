@@ -27,10 +27,13 @@ from typing import List
 
 from pydantic import BaseModel
 from pydantic import RootModel
+import pytest
 
 from esg.models.base import _BaseModel
 from esg.models.base import _RootModel
 
+pytestmark = pytest.mark.unit
+
 
 class CustomModelMixinTests:
     """
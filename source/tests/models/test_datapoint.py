@@ -19,11 +19,15 @@ SPDX-License-Identifier: Apache-2.0
 
 from copy import deepcopy
 
+import pytest
+
 from esg.models import datapoint
 from esg.test import data as td
 from esg.test.generic_tests import GenericMessageSerializationTest
 from esg.test.generic_tests import GenericMessageSerializationTestBEMcom
 
+pytestmark = pytest.mark.unit
+
 
 class TestDatapoint(GenericMessageSerializationTest):
     ModelClass = datapoint.Datapoint
@@ -17,10 +17,14 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
+import pytest
+
 from esg.models import metadata
 from esg.test import data as td
 from esg.test.generic_tests import GenericMessageSerializationTest
 
+pytestmark = pytest.mark.unit
+
 
 class TestGeographicPosition(GenericMessageSerializationTest):
 
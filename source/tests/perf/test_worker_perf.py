@@ -0,0 +1,71 @@
+"""
+Performance tests for `esg.service.worker`
+
+Copyright 2024 FZI Research Center for Information Technology
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
+SPDX-License-Identifier: Apache-2.0
+"""
+
+from typing import List
+
+from pydantic import BaseModel
+import pytest
+
+from esg.service.worker import execute_payload
+
+# The benchmarks are optional, see the `perf` extra in `setup.py`.
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.perf
+
+# The mean runtime of `execute_payload` that is considered acceptable.
+# This is very generous and should only catch severe regressions, like
+# parsing the input with `json.loads` followed by `model_validate`.
+MAX_MEAN_RUNTIME_SECONDS = 0.005
+
+
+class DemoInputDataModel(BaseModel):
+    ints: List[int]
+
+
+class DemoOutputDataModel(BaseModel):
+    sum: int
+
+
+def demo_payload_function(input_data):
+    return {"sum": sum(input_data.ints)}
+
+
+def test_execute_payload_perf(benchmark):
+    """
+    Measure `execute_payload` for an input of 1000 ints passed as bytes,
+    which is how the API forwards the request body.
+    """
+    input_data_json = b'{"ints": [' + ",".join(["1"] * 1000).encode() + b"]}"
+
+    output_data_json = benchmark(
+        execute_payload,
+        input_data_json=input_data_json,
+        InputDataModel=DemoInputDataModel,
+        payload_function=demo_payload_function,
+        OutputDataModel=DemoOutputDataModel,
+    )
+
+    assert output_data_json == '{"sum":1000}'
+
+    # Benchmarks are disabled by pytest-benchmark if running with xdist.
+    if not benchmark.disabled:
+        assert benchmark.stats["mean"] < MAX_MEAN_RUNTIME_SECONDS
@@ -42,6 +42,9 @@ from .data import REQUEST_OUTPUTS_FOOC_TEST
 from .data import FIT_PARAM_INPUTS_FOOC_TEST
 from .data import FIT_PARAM_OUTPUTS_FOOC_TEST
 
+pytestmark = pytest.mark.integration
+
+
 RequestInput = compute_request_input_model(
     RequestArguments=RequestArguments,
     FittedParameters=FittedParameters,
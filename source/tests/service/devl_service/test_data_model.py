@@ -19,6 +19,8 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
+import pytest
+
 from esg.service.worker import compute_request_input_model
 from esg.service.worker import compute_fit_parameters_input_model
 from esg.test.generic_tests import GenericMessageSerializationTest
@@ -37,6 +39,8 @@ from .data import FIT_PARAM_OUTPUTS_MODEL_TEST
 from .data import INVALID_FIT_PARAM_INPUTS
 from .data import INVALID_FIT_PARAM_OUTPUTS
 
+pytestmark = pytest.mark.unit
+
 
 RequestInput = compute_request_input_model(
     RequestArguments=RequestArguments,
@@ -39,6 +39,9 @@ from .data import REQUEST_OUTPUTS_FOOC_TEST
 from .data import FIT_PARAM_INPUTS_FOOC_TEST
 from .data import FIT_PARAM_OUTPUTS_FOOC_TEST
 
+pytestmark = pytest.mark.unit
+
+
 RequestInput = compute_request_input_model(
     RequestArguments=RequestArguments,
     FittedParameters=FittedParameters,
@@ -38,6 +38,8 @@ from .data import REQUEST_OUTPUTS_FOOC_TEST
 from .data import FIT_PARAM_INPUTS_FOOC_TEST
 from .data import FIT_PARAM_OUTPUTS_FOOC_TEST
 
+pytestmark = pytest.mark.unit
+
 
 @pytest.mark.skipif(np is None, reason="requires numpy")
 @pytest.mark.skipif(app is None, reason="requires Celery")
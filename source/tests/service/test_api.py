@@ -22,24 +22,22 @@ SPDX-License-Identifier: Apache-2.0
 import json
 import logging
 import os
+from contextlib import ExitStack
 from datetime import datetime, timedelta, timezone
 from functools import reduce
-from time import sleep
+from time import monotonic, sleep
 from typing import Optional
 from unittest.mock import MagicMock, patch
 from uuid import UUID
 
 import jwt
-import pydantic
 import pytest
 import requests
-from esg.test.jwt_utils import (
-    INVALID_RSA_PRIVATE_KEY,
-    RSA256_KEY,
-    RSA256_PRIVATE_KEY,
-)
+from esg.test.jwt_utils import RSA256_KEY
 from esg.test.tools import APIInProcess
 from fastapi import FastAPI
+from pydantic import create_model
+from requests.adapters import HTTPAdapter
 
 # To prevent tests from failing if only parts of the package are used.
 try:
@@ -74,6 +72,13 @@ from esg.service.worker import (
     invoke_handle_request,
 )
 
+logger = logging.getLogger(__name__)
+
+# The API servers are module scoped fixtures, keeping all tests of this module
+# on one xdist worker (with `--dist=loadgroup`) prevents that every worker
+# starts its own copies of the servers.
+pytestmark = pytest.mark.xdist_group(name="service_api")
+
 
 def deep_get(dictionary, *keys):
     """
@@ -83,6 +88,47 @@ def deep_get(dictionary, *keys):
     return reduce(lambda d, key: d.get(key) if d else None, keys, dictionary)
 
 
+def wait_for_state(
+    task, target_states, timeout=2.0, interval=0.002, max_interval=0.05
+):
+    """
+    Block until the celery task has reached one of `target_states`.
+
+    This replaces fixed sleeps after starting a task, which would wait
+    unnecessarily long in most cases but could still be too short on a
+    loaded machine. The time between two checks grows by 50% per check,
+    i.e. fast tasks are detected quickly while slow ones don't hammer the
+    result backend.
+
+    Arguments:
+    ----------
+    task : celery.result.AsyncResult
+        The task to wait for, e.g. as returned by `delay`.
+    target_states : list of str
+        The celery states to wait for.
+    timeout : float
+        Seconds after which to give up waiting.
+    interval : float
+        Seconds to sleep after the first check of the task state.
+    max_interval : float
+        Upper bound for the time between two checks of the task state.
+
+    Raises:
+    -------
+    TimeoutError:
+        If the task has not reached any of `target_states` after `timeout`.
+    """
+    deadline = monotonic() + timeout
+    while task.state not in target_states:
+        if monotonic() > deadline:
+            raise TimeoutError(
+                f"Task {task.id} did not reach any of {target_states} "
+                f"within {timeout} seconds. Last state: {task.state}"
+            )
+        sleep(interval)
+        interval = min(interval * 1.5, max_interval)
+
+
 class DummyRequestArguments(_BaseModel):
     argument_as_float: float
 
@@ -107,41 +153,70 @@ class DummyObservations(_BaseModel):
 API_DEFAULT_KWARGS = {
     "RequestArguments": DummyRequestArguments,
     "RequestOutput": DummyRequestOutput,
-    "request_task": MagicMock(),
+    "request_task": None,
     "title": "TestService",
     "FitParameterArguments": DummyFitParameterArguments,
     "Observations": DummyObservations,
     "FittedParameters": DummyFittedParameters,
-    "fit_parameters_task": MagicMock(),
+    "fit_parameters_task": None,
     "description": "A nice service for testing.",
 }
 
 
-@pytest.fixture(autouse=True)
+def api_kwargs_with_mock_tasks():
+    """
+    `API_DEFAULT_KWARGS` with stand-ins for the tasks.
+
+    The APIs created with these arguments never submit a task (requests are
+    rejected before), hence plain no-op functions suffice and no mocks are
+    needed.
+    """
+    return API_DEFAULT_KWARGS | {
+        "request_task": lambda *args, **kwargs: None,
+        "fit_parameters_task": lambda *args, **kwargs: None,
+    }
+
+
+@pytest.fixture
+def api_default_kwargs():
+    """
+    `API_DEFAULT_KWARGS` with stand-ins for the tasks.
+
+    A fresh dict per test prevents that modifications of the arguments
+    leak between tests.
+    """
+    return api_kwargs_with_mock_tasks()
+
+
+@pytest.fixture(autouse=True, scope="module")
 def inject_version_number():
     with patch.dict(os.environ, {"VERSION": "0.1.2"}):
         yield
 
 
 @pytest.fixture(scope="session")
-def dummy_tasks(celery_session_app, celery_session_worker):
+def all_dummy_tasks(celery_session_app, celery_session_worker):
     """
-    Tasks for testing for both cases, request and fit-parameters.
+    All celery tasks used in this file.
+
+    NOTE: These are registered in one place as `celery_session_worker.reload()`
+          is by far the most expensive operation of the celery test setup
+          and should hence be executed only once per session.
     """
 
     @celery_session_app.task
     def request_task(input_data_json):
         def handle_request(input_data):
             """Compute outputs matching the dummy models defined above."""
-            print("`handle_request` input: ", input_data.model_dump_json())
             output = {
                 "argument_as_str": str(input_data.arguments.argument_as_float)
             }
-            if hasattr(input_data.parameters, "parameter_as_float"):
+            parameter_as_float = getattr(
+                input_data.parameters, "parameter_as_float", None
+            )
+            if parameter_as_float is not None:
                 # This is a request for a service that can fit parameters.
-                output["parameter_as_str"] = str(
-                    input_data.parameters.parameter_as_float
-                )
+                output["parameter_as_str"] = str(parameter_as_float)
             return output
 
         output_data_json = invoke_handle_request(
@@ -157,7 +232,6 @@ def dummy_tasks(celery_session_app, celery_session_worker):
     def fit_parameters_task(input_data_json):
         def fit_parameters(input_data):
             """Compute outputs matching the dummy models defined above."""
-            print("`fit_parameters` input: ", input_data.model_dump_json())
             parameter_as_float = input_data.arguments.argument_as_float
             offset = input_data.observations.argument_offset
             parameter_as_float += offset
@@ -173,15 +247,117 @@ def dummy_tasks(celery_session_app, celery_session_worker):
         )
         return output_data_json
 
+    # NOTE: `update_state` writes to the result backend regardless of
+    #       `ignore_result`, only the (not needed) result is not stored.
+    #       `task_that_raises` must not ignore results as the tests require
+    #       the FAILURE state to be stored.
+    @celery_session_app.task(ignore_result=True)
+    def task_with_state(state):
+        current_task.update_state(state=state)
+        logger.debug("Task updated state to: %s", state)
+        # Make celery not emit a SUCCESS state after returning.
+        raise Ignore()
+
+    @celery_session_app.task
+    def task_that_raises(exception_name):
+        if exception_name == "ValueError":
+            raise ValueError()
+        if exception_name == "RequestInducedException":
+            raise RequestInducedException("The user fucked up.")
+        if exception_name == "GenericUnexpectedException":
+            raise GenericUnexpectedException()
+
+    @celery_session_app.task
+    def _dummy_worker_task(x, y):
+        return x * y
+
     celery_session_worker.reload()
 
-    dummy_tasks = {
+    all_dummy_tasks = {
         "request_task": request_task,
         "fit_parameters_task": fit_parameters_task,
+        "task_with_state": task_with_state,
+        "task_that_raises": task_that_raises,
+        "dummy_worker_task": _dummy_worker_task,
+    }
+    return all_dummy_tasks
+
+
+@pytest.fixture(scope="session")
+def dummy_tasks(all_dummy_tasks):
+    """
+    Tasks for testing for both cases, request and fit-parameters.
+    """
+    dummy_tasks = {
+        "request_task": all_dummy_tasks["request_task"],
+        "fit_parameters_task": all_dummy_tasks["fit_parameters_task"],
     }
     return dummy_tasks
 
 
+@pytest.fixture(scope="module")
+def serve_api(dummy_tasks):
+    """
+    Factory that serves an API with `API_DEFAULT_KWARGS`, the dummy tasks
+    and the given overrides and returns the base URL of it.
+
+    APIs with identical overrides are started only once and shared by all
+    tests of this file, as starting `APIInProcess` is the most expensive
+    part of most tests here. The servers are stopped at the end of the
+    module.
+    """
+    base_urls_by_overrides = {}
+    with ExitStack() as stack:
+
+        def _serve_api(**overrides):
+            key = tuple(sorted(overrides.items()))
+            if key not in base_urls_by_overrides:
+                api_kwargs = API_DEFAULT_KWARGS | dummy_tasks | overrides
+                test_api = API(**api_kwargs)
+                base_url_root = stack.enter_context(APIInProcess(test_api))
+                base_urls_by_overrides[key] = base_url_root
+            return base_urls_by_overrides[key]
+
+        yield _serve_api
+
+
+@pytest.fixture(scope="module")
+def api_url(serve_api):
+    """
+    Base URL of an API with the dummy tasks that is served once for all
+    tests of this file that don't need a specially configured API.
+    """
+    return serve_api()
+
+
+@pytest.fixture(scope="module")
+def http():
+    """
+    A `requests.Session` shared by all tests of this file.
+
+    The session keeps the connections to the test APIs alive, which saves
+    setting up a new TCP connection for every request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    yield session
+    session.close()
+
+
+# Root paths that must be rejected for `VERSION=2.3.4`.
+INVALID_ROOT_PATHS = [
+    " ",  # No version at all.
+    "a/v2/",  # Valid version but no leading slash.
+    "/a/v2/",  # Valid version but a trailing slash.
+    "/",  # No version at all but trailing and leading slash.
+    "/test",  # No version at all.
+    "/foo/v1",  # Wrong version number.
+    "/foo/v2/bar",  # Version not at end.
+]
+
+
+@pytest.mark.unit
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -191,7 +367,26 @@ class TestApiInit:
     Tests for `esg.service.api.API.__init__`
     """
 
-    def test_environment_variables_loaded(self):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def default_api(cls):
+        """
+        An API with default arguments and environment. Shared by all tests
+        that only inspect the instance, to save building the FastAPI app.
+        """
+        return API(**api_kwargs_with_mock_tasks())
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def request_only_api(cls):
+        """
+        Like `default_api` but without fit-parameters endpoints.
+        """
+        api_kwargs = api_kwargs_with_mock_tasks()
+        api_kwargs["fit_parameters_task"] = None
+        return API(**api_kwargs)
+
+    def test_environment_variables_loaded(self, api_default_kwargs):
         """
         Verify that the environment variable settings are parsed to the
         expected values.
@@ -203,12 +398,12 @@ class TestApiInit:
         }
 
         with patch.dict(os.environ, envs):
-            api = API(**API_DEFAULT_KWARGS)
+            api = API(**api_default_kwargs)
 
         assert api._loglevel == logging.CRITICAL
         assert api.fastapi_app.root_path == "/test/v1"
 
-    def test_default_environment_variables(self):
+    def test_default_environment_variables(self, api_default_kwargs):
         """
         Check that the environment variables have the expected values,
         i.e. those defined in the Readme.
@@ -220,12 +415,14 @@ class TestApiInit:
         }
 
         with patch.dict(os.environ, envs):
-            api = API(**API_DEFAULT_KWARGS)
+            api = API(**api_default_kwargs)
 
         assert api._loglevel == logging.INFO
         assert api.fastapi_app.root_path == "/v2"
 
-    def test_version_environment_variable_raises_if_not_set(self):
+    def test_version_environment_variable_raises_if_not_set(
+        self, api_default_kwargs
+    ):
         """
         The service definitely needs a version number. Hence we cannot
         start the service without it.
@@ -236,31 +433,20 @@ class TestApiInit:
 
         with patch.dict(os.environ, envs):
             with pytest.raises(ValueError):
-                _ = API(**API_DEFAULT_KWARGS)
+                _ = API(**api_default_kwargs)
 
-    def test_root_path_checked(self):
+    @pytest.mark.parametrize("invalid_root_path", INVALID_ROOT_PATHS)
+    def test_root_path_rejected(self, invalid_root_path, api_default_kwargs):
         """
         By convention the root path should contain the version info
         on the last path segment.
         """
-        invalid_root_paths = [
-            " ",  # No version at all.
-            "a/v2/",  # Valid version but no leading slash.
-            "/a/v2/",  # Valid version but a trailing slash.
-            "/",  # No version at all but trailing and leading slash.
-            "/test",  # No version at all.
-            "/foo/v1",  # Wrong version number.
-            "/foo/v2/bar",  # Version not at end.
-        ]
-
-        for invalid_root_path in invalid_root_paths:
-            print(f"Testing {invalid_root_path}")
-            envs = {"ROOT_PATH": invalid_root_path, "VERSION": "2.3.4"}
-            with patch.dict(os.environ, envs):
-                with pytest.raises(ValueError):
-                    _ = API(**API_DEFAULT_KWARGS)
+        envs = {"ROOT_PATH": invalid_root_path, "VERSION": "2.3.4"}
+        with patch.dict(os.environ, envs):
+            with pytest.raises(ValueError):
+                _ = API(**api_default_kwargs)
 
-    def test_devl_version_accepted(self):
+    def test_devl_version_accepted(self, api_default_kwargs):
         """
         We often wish to deploy a service with the version set to a git
         branch name plus a commit (short) ID. This should be accepted too.
@@ -273,11 +459,11 @@ class TestApiInit:
 
         envs = {"ROOT_PATH": root_path, "VERSION": version}
         with patch.dict(os.environ, envs):
-            api = API(**API_DEFAULT_KWARGS)
+            api = API(**api_default_kwargs)
 
         assert api.fastapi_app.root_path == root_path
 
-    def test_devl_version_short_accepted(self):
+    def test_devl_version_short_accepted(self, api_default_kwargs):
         """
         In addition to `test_devl_version_accepted` some people
         might have a short branch name and use it directly as version.
@@ -287,11 +473,11 @@ class TestApiInit:
 
         envs = {"ROOT_PATH": root_path, "VERSION": version}
         with patch.dict(os.environ, envs):
-            api = API(**API_DEFAULT_KWARGS)
+            api = API(**api_default_kwargs)
 
         assert api.fastapi_app.root_path == root_path
 
-    def test_version_root_path_overloads(self):
+    def test_version_root_path_overloads(self, api_default_kwargs):
         """
         Check that we can overload the expected version number in `ROOT_PATH`.
 
@@ -305,7 +491,7 @@ class TestApiInit:
 
         envs = {"ROOT_PATH": root_path, "VERSION": version}
 
-        api_kwargs = API_DEFAULT_KWARGS | {
+        api_kwargs = api_default_kwargs | {
             "version_root_path": version_root_path,
         }
         with patch.dict(os.environ, envs):
@@ -314,12 +500,12 @@ class TestApiInit:
 
         assert api.fastapi_app.root_path == root_path
 
-    def test_logger_available(self, caplog):
+    def test_logger_available(self, caplog, api_default_kwargs):
         """
         Verify that it is possible to use the logger of the service to create
         log messages.
         """
-        api = API(**API_DEFAULT_KWARGS)
+        api = API(**api_default_kwargs)
 
         caplog.clear()
 
@@ -330,7 +516,7 @@ class TestApiInit:
         assert records[0].levelname == "INFO"
         assert records[0].message == "A test info message"
 
-    def test_loglevel_changed(self, caplog):
+    def test_loglevel_changed(self, caplog, api_default_kwargs):
         """
         Verify that it is possible to change ot logging level of the logger
         by setting the corresponding environment variable.
@@ -340,7 +526,7 @@ class TestApiInit:
         }
 
         with patch.dict(os.environ, envs):
-            api = API(**API_DEFAULT_KWARGS)
+            api = API(**api_default_kwargs)
 
         caplog.clear()
 
@@ -354,20 +540,22 @@ class TestApiInit:
         assert records[0].levelname == "WARNING"
         assert records[0].message == "A test warning message"
 
-    def test_shared_objects_are_created(self):
+    def test_shared_objects_are_created(self, default_api):
         """
         Verify that the class objects expected by other methods are
         exposed.
         """
-        api = API(**API_DEFAULT_KWARGS)
+        api = default_api
         assert isinstance(api.fastapi_app, FastAPI)
 
-    def test_access_token_checker_created(self, openid_like_test_idp):
+    def test_access_token_checker_created(
+        self, openid_like_test_idp_session, api_default_kwargs
+    ):
         """
         Check that the JWT access token checker class is created with the
         correct arguments.
         """
-        expected_issuer = openid_like_test_idp[1]
+        expected_issuer = openid_like_test_idp_session[1]
         expected_audience = "some_client_id"
         envs = {
             "AUTH_JWT_ISSUER": expected_issuer,
@@ -375,7 +563,7 @@ class TestApiInit:
         }
 
         with patch.dict(os.environ, envs):
-            api = API(**API_DEFAULT_KWARGS)
+            api = API(**api_default_kwargs)
 
         assert hasattr(api, "access_token_checker")
         atc = api.access_token_checker
@@ -386,12 +574,14 @@ class TestApiInit:
         assert atc.expected_role_claim is None
         assert atc.expected_roles is None
 
-    def test_access_token_checker_created_roles(self, openid_like_test_idp):
+    def test_access_token_checker_created_roles(
+        self, openid_like_test_idp_session, api_default_kwargs
+    ):
         """
         Like `test_access_token_checker_created` but now additionally with
         roles set.
         """
-        expected_issuer = openid_like_test_idp[1]
+        expected_issuer = openid_like_test_idp_session[1]
         expected_audience = "some_client_id"
         # Something like this can be found in JWTs issued by Keycloak with
         # default settings.
@@ -411,7 +601,7 @@ class TestApiInit:
         }
 
         with patch.dict(os.environ, envs):
-            api = API(**API_DEFAULT_KWARGS)
+            api = API(**api_default_kwargs)
 
         assert hasattr(api, "access_token_checker")
         atc = api.access_token_checker
@@ -420,7 +610,7 @@ class TestApiInit:
         assert atc.expected_role_claim == expected_role_claim
         assert atc.expected_roles == expected_roles
 
-    def test_named_fastapi_args_forwarded(self):
+    def test_named_fastapi_args_forwarded(self, api_default_kwargs):
         """
         Check that named args for FastAPI (like `description` and `title`)
         are forwarded.
@@ -428,7 +618,7 @@ class TestApiInit:
         test_title = ("Not Default Arg Title",)
         test_description = "A nice service for testing the description arg."
 
-        api_kwargs = API_DEFAULT_KWARGS | {
+        api_kwargs = api_default_kwargs | {
             "title": test_title,
             "description": test_description,
         }
@@ -437,16 +627,20 @@ class TestApiInit:
         assert api.fastapi_app.title == test_title
         assert api.fastapi_app.description == test_description
 
-    def test_models_computed_request_only(self):
+    def test_models_computed_request_only(self, request_only_api):
         """
         Verify that the data models are computed correctly for the case that
         only request endpoints should be available.
         """
-        api_kwargs = API_DEFAULT_KWARGS | {"fit_parameters_task": None}
-        api = API(**api_kwargs)
+        api = request_only_api
 
-        ExpectedRequestInput = compute_request_input_model(
-            RequestArguments=DummyRequestArguments,
+        # NOTE: Built independently of `compute_request_input_model`, as
+        #       that is cached and would return the very same model as the
+        #       one used by the API. The name matters for the schema.
+        ExpectedRequestInput = create_model(
+            "RequestInput",
+            __base__=_BaseModel,
+            arguments=(DummyRequestArguments, ...),
         )
         expected_ri_schema = ExpectedRequestInput.model_json_schema()
         ExpectedRequestOutput = DummyRequestOutput
@@ -455,23 +649,29 @@ class TestApiInit:
         assert api.RequestInput.model_json_schema() == expected_ri_schema
         assert api.RequestOutput.model_json_schema() == expected_ro_schema
 
-    def test_models_computed_fit_parameters(self):
+    def test_models_computed_fit_parameters(self, default_api):
         """
         Verify that the data models are computed correctly for the case that
         request and fit-parameters endpoints should be available.
         """
-        api = API(**API_DEFAULT_KWARGS)
+        api = default_api
 
-        ExpectedRequestInput = compute_request_input_model(
-            RequestArguments=DummyRequestArguments,
-            FittedParameters=DummyFittedParameters,
+        # NOTE: See `test_models_computed_request_only` for why the models
+        #       are not computed with the functions from the worker.
+        ExpectedRequestInput = create_model(
+            "RequestInput",
+            __base__=_BaseModel,
+            arguments=(DummyRequestArguments, ...),
+            parameters=(DummyFittedParameters, ...),
         )
         expected_ri_schema = ExpectedRequestInput.model_json_schema()
         ExpectedRequestOutput = DummyRequestOutput
         expected_ro_schema = ExpectedRequestOutput.model_json_schema()
-        ExpectedFitParametersInput = compute_fit_parameters_input_model(
-            FitParameterArguments=DummyFitParameterArguments,
-            Observations=DummyObservations,
+        ExpectedFitParametersInput = create_model(
+            "FitParametersInput",
+            __base__=_BaseModel,
+            arguments=(DummyFitParameterArguments, ...),
+            observations=(DummyObservations, ...),
         )
         expected_fpi_schema = ExpectedFitParametersInput.model_json_schema()
         ExpectedFitParametersOutput = DummyFittedParameters
@@ -484,7 +684,7 @@ class TestApiInit:
             api.FitParametersOutput.model_json_schema() == expected_fpo_schema
         )
 
-    def test_input_models_in_schema_request_only(self):
+    def test_input_models_in_schema_request_only(self, request_only_api):
         """
         This is about the approach introduced in the FastAPI docs how
         the OpenAPI schema can be extended with the `model_json_schema()`
@@ -497,8 +697,7 @@ class TestApiInit:
         section of the OpenAPI schema. This test verifies that the model data
         is placed in the correct part of the schema.
         """
-        api_kwargs = API_DEFAULT_KWARGS | {"fit_parameters_task": None}
-        api = API(**api_kwargs)
+        api = request_only_api
 
         schema = api.fastapi_app.openapi()
 
@@ -523,26 +722,28 @@ class TestApiInit:
         assert "$defs" not in schema_relevant_part
 
         # Verify that the reference to the components section is correct.
-        expected_references = {
-            "arguments": "#/components/schemas/DummyRequestArguments"
+        expected_schema_names = {
+            "arguments": "DummyRequestArguments"
         }
-        for key, expected_ref in expected_references.items():
+        for key, schema_name in expected_schema_names.items():
             actual_ref = schema_relevant_part["properties"][key]["$ref"]
-            assert actual_ref == expected_ref
+            assert actual_ref == f"#/components/schemas/{schema_name}"
 
         # Verify that the corresponding item exists in the components section.
-        for expected_ref in expected_references.values():
-            print(f"Checking for existence of {expected_ref}")
-            component_entry = deep_get(schema, *expected_ref.split("/")[1:])
+        for schema_name in expected_schema_names.values():
+            logger.debug("Checking for existence of %s", schema_name)
+            component_entry = deep_get(
+                schema, "components", "schemas", schema_name
+            )
             # Assert that the expected entry exists.
             assert component_entry is not None
 
-    def test_input_models_in_schema_fit_parameters(self):
+    def test_input_models_in_schema_fit_parameters(self, default_api):
         """
         Like `test_input_models_in_schema_request_only` above but now for the
         case that fit parameters is used too.
         """
-        api = API(**API_DEFAULT_KWARGS)
+        api = default_api
 
         schema = api.fastapi_app.openapi()
 
@@ -568,18 +769,20 @@ class TestApiInit:
         assert "$defs" not in schema_relevant_part
 
         # Verify that the reference to the components section is correct.
-        expected_references = {
-            "arguments": "#/components/schemas/DummyRequestArguments",
-            "parameters": "#/components/schemas/DummyFittedParameters",
+        expected_schema_names = {
+            "arguments": "DummyRequestArguments",
+            "parameters": "DummyFittedParameters",
         }
-        for key, expected_ref in expected_references.items():
+        for key, schema_name in expected_schema_names.items():
             actual_ref = schema_relevant_part["properties"][key]["$ref"]
-            assert actual_ref == expected_ref
+            assert actual_ref == f"#/components/schemas/{schema_name}"
 
         # Verify that the corresponding item exists in the components section.
-        for expected_ref in expected_references.values():
-            print(f"Checking for existence of {expected_ref}")
-            component_entry = deep_get(schema, *expected_ref.split("/")[1:])
+        for schema_name in expected_schema_names.values():
+            logger.debug("Checking for existence of %s", schema_name)
+            component_entry = deep_get(
+                schema, "components", "schemas", schema_name
+            )
             # Assert that the expected entry exists.
             assert component_entry is not None
 
@@ -606,22 +809,25 @@ class TestApiInit:
         assert "$defs" not in schema_relevant_part
 
         # Verify that the reference to the components section is correct.
-        expected_references = {
-            "arguments": "#/components/schemas/DummyFitParameterArguments",
-            "observations": "#/components/schemas/DummyObservations",
+        expected_schema_names = {
+            "arguments": "DummyFitParameterArguments",
+            "observations": "DummyObservations",
         }
-        for key, expected_ref in expected_references.items():
+        for key, schema_name in expected_schema_names.items():
             actual_ref = schema_relevant_part["properties"][key]["$ref"]
-            assert actual_ref == expected_ref
+            assert actual_ref == f"#/components/schemas/{schema_name}"
 
         # Verify that the corresponding item exists in the components section.
-        for expected_ref in expected_references.values():
-            print(f"Checking for existence of {expected_ref}")
-            component_entry = deep_get(schema, *expected_ref.split("/")[1:])
+        for schema_name in expected_schema_names.values():
+            logger.debug("Checking for existence of %s", schema_name)
+            component_entry = deep_get(
+                schema, "components", "schemas", schema_name
+            )
             # Assert that the expected entry exists.
             assert component_entry is not None
 
 
+@pytest.mark.integration
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -636,7 +842,7 @@ class TestApiValidateJwt:
     """
 
     def call_and_check_status_code(
-        self, base_url_root, expected_status_code, token=None
+        self, http, base_url_root, expected_status_code, token=None
     ):
         """
         Calls all endpoints of the API and checks the status codes of the
@@ -644,6 +850,8 @@ class TestApiValidateJwt:
 
         Arguments:
         ----------
+        http : requests.Session
+            The session used to call the API.
         base_url_root : str
             The base URL of the API as returned by `APIInProcess`.
         expected_status_code : int
@@ -659,20 +867,20 @@ class TestApiValidateJwt:
             headers = None
 
         for endpoint in ["request", "fit-parameters"]:
-            response = requests.post(
+            response = http.post(
                 f"{base_url_root}/{endpoint}/",
                 headers=headers,
                 json={},
             )
             assert response.status_code == expected_status_code
 
-            response = requests.get(
+            response = http.get(
                 f"{base_url_root}/{endpoint}/{bad_uuid}/status/",
                 headers=headers,
             )
             assert response.status_code == expected_status_code
 
-            response = requests.get(
+            response = http.get(
                 f"{base_url_root}/{endpoint}/{bad_uuid}/result/",
                 headers=headers,
             )
@@ -693,13 +901,15 @@ class TestApiValidateJwt:
             payload.update(extra)
         return payload
 
-    def test_endpoints_protected(self, openid_like_test_idp):
+    def test_endpoints_protected(
+        self, openid_like_test_idp_session, api_default_kwargs, http
+    ):
         """
         Check that the endpoints are protected, i.e. that calls without
         a header are rejected.
         """
 
-        test_issuer = openid_like_test_idp[1]
+        test_issuer = openid_like_test_idp_session[1]
         test_audience = "some_client_id"
         envs = {
             "AUTH_JWT_ISSUER": test_issuer,
@@ -707,18 +917,24 @@ class TestApiValidateJwt:
         }
 
         with patch.dict(os.environ, envs):
-            test_api = API(**API_DEFAULT_KWARGS)
+            test_api = API(**api_default_kwargs)
             with APIInProcess(test_api) as base_url_root:
                 self.call_and_check_status_code(
-                    base_url_root, expected_status_code=401
+                    http, base_url_root, expected_status_code=401
                 )
 
-    def test_valid_token_accepted(self, openid_like_test_idp):
+    def test_valid_token_accepted(
+        self,
+        openid_like_test_idp_session,
+        api_default_kwargs,
+        http,
+        rsa_private_key,
+    ):
         """
         Check that the access is possible with a valid token.
         """
 
-        test_issuer = openid_like_test_idp[1]
+        test_issuer = openid_like_test_idp_session[1]
         test_audience = "some_client_id"
         envs = {
             "AUTH_JWT_ISSUER": test_issuer,
@@ -728,23 +944,30 @@ class TestApiValidateJwt:
         token = jwt.encode(
             self._generate_payload(issuer=test_issuer, audience=test_audience),
             algorithm="RS256",
-            key=RSA256_PRIVATE_KEY,
+            key=rsa_private_key,
             headers={"kid": RSA256_KEY["kid"]},
         )
 
         with patch.dict(os.environ, envs):
-            test_api = API(**API_DEFAULT_KWARGS)
+            test_api = API(**api_default_kwargs)
             with APIInProcess(test_api) as base_url_root:
                 self.call_and_check_status_code(
-                    base_url_root, expected_status_code=422, token=token
+                    http, base_url_root, expected_status_code=422, token=token
                 )
 
-    def test_invalid_tokens_rejected(self, openid_like_test_idp):
+    def test_invalid_tokens_rejected(
+        self,
+        openid_like_test_idp_session,
+        api_default_kwargs,
+        http,
+        rsa_private_key,
+        invalid_rsa_private_key,
+    ):
         """
         Check that access is rejected if tokens are invalid.
         """
 
-        test_issuer = openid_like_test_idp[1]
+        test_issuer = openid_like_test_idp_session[1]
         test_audience = "some_client_id"
         envs = {
             "AUTH_JWT_ISSUER": test_issuer,
@@ -757,7 +980,7 @@ class TestApiValidateJwt:
                     issuer="http://google.com", audience=test_audience
                 ),
                 algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
+                key=rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
             "wrong audience": jwt.encode(
@@ -765,7 +988,7 @@ class TestApiValidateJwt:
                     issuer=test_issuer, audience="Nope audiance"
                 ),
                 algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
+                key=rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
             "wrong signing key": jwt.encode(
@@ -773,27 +996,34 @@ class TestApiValidateJwt:
                     issuer=test_issuer, audience=test_audience
                 ),
                 algorithm="RS256",
-                key=INVALID_RSA_PRIVATE_KEY,
+                key=invalid_rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
         }
 
         with patch.dict(os.environ, envs):
-            test_api = API(**API_DEFAULT_KWARGS)
+            test_api = API(**api_default_kwargs)
             with APIInProcess(test_api) as base_url_root:
                 for reason_to_fail, invalid_token in invalid_tokens.items():
-                    print(f"Checking token with: {reason_to_fail}")
+                    logger.debug("Checking token with: %s", reason_to_fail)
                     self.call_and_check_status_code(
+                        http,
                         base_url_root,
                         expected_status_code=401,
                         token=invalid_token,
                     )
 
-    def test_valid_token_with_roles_accepted(self, openid_like_test_idp):
+    def test_valid_token_with_roles_accepted(
+        self,
+        openid_like_test_idp_session,
+        api_default_kwargs,
+        http,
+        rsa_private_key,
+    ):
         """
         Check that the access is possible with a valid token if roles are set.
         """
-        test_issuer = openid_like_test_idp[1]
+        test_issuer = openid_like_test_idp_session[1]
         test_audience = "some_client_id"
         test_role_claim = [
             "resource_access",
@@ -817,24 +1047,31 @@ class TestApiValidateJwt:
                 },
             ),
             algorithm="RS256",
-            key=RSA256_PRIVATE_KEY,
+            key=rsa_private_key,
             headers={"kid": RSA256_KEY["kid"]},
         )
 
         with patch.dict(os.environ, envs):
-            test_api = API(**API_DEFAULT_KWARGS)
+            test_api = API(**api_default_kwargs)
             with APIInProcess(test_api) as base_url_root:
                 self.call_and_check_status_code(
-                    base_url_root, expected_status_code=422, token=token
+                    http, base_url_root, expected_status_code=422, token=token
                 )
 
-    def test_invalid_tokens_with_roles_rejected(self, openid_like_test_idp):
+    def test_invalid_tokens_with_roles_rejected(
+        self,
+        openid_like_test_idp_session,
+        api_default_kwargs,
+        http,
+        rsa_private_key,
+        invalid_rsa_private_key,
+    ):
         """
         Check that access is rejected if tokens are invalid, here for
         the roles case
         """
 
-        test_issuer = openid_like_test_idp[1]
+        test_issuer = openid_like_test_idp_session[1]
         test_audience = "some_client_id"
         test_role_claim = [
             "resource_access",
@@ -861,7 +1098,7 @@ class TestApiValidateJwt:
                     },
                 ),
                 algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
+                key=rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
             "wrong audience": jwt.encode(
@@ -875,7 +1112,7 @@ class TestApiValidateJwt:
                     },
                 ),
                 algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
+                key=rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
             "wrong signing key": jwt.encode(
@@ -889,7 +1126,7 @@ class TestApiValidateJwt:
                     },
                 ),
                 algorithm="RS256",
-                key=INVALID_RSA_PRIVATE_KEY,
+                key=invalid_rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
             "wrong role": jwt.encode(
@@ -903,7 +1140,7 @@ class TestApiValidateJwt:
                     },
                 ),
                 algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
+                key=rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
             "only part of role claim": jwt.encode(
@@ -913,7 +1150,7 @@ class TestApiValidateJwt:
                     extra={"resource_access": "nope"},
                 ),
                 algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
+                key=rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
             "no role claim at all": jwt.encode(
@@ -922,23 +1159,25 @@ class TestApiValidateJwt:
                     audience=test_audience,
                 ),
                 algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
+                key=rsa_private_key,
                 headers={"kid": RSA256_KEY["kid"]},
             ),
         }
 
         with patch.dict(os.environ, envs):
-            test_api = API(**API_DEFAULT_KWARGS)
+            test_api = API(**api_default_kwargs)
             with APIInProcess(test_api) as base_url_root:
                 for reason_to_fail, invalid_token in invalid_tokens.items():
-                    print(f"Checking token with: {reason_to_fail}")
+                    logger.debug("Checking token with: %s", reason_to_fail)
                     self.call_and_check_status_code(
+                        http,
                         base_url_root,
                         expected_status_code=401,
                         token=invalid_token,
                     )
 
 
+@pytest.mark.integration
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -948,353 +1187,333 @@ class TestRun:
     Tests for `esg.service.api.API.run`
     """
 
+    class RaisingApp:
+        """
+        Stand-in for the FastAPI app that fails as soon as uvicorn calls it.
+        """
+
+        root_path = ""
+
+        def __call__(self, *args, **kwargs):
+            raise RuntimeError()
+
     def test_close_executed(self):
         """
         The run method should call the close method clean up.
         """
-        api = API(**API_DEFAULT_KWARGS)
+        # `run` only needs the attributes set below, hence skip the
+        # expensive `__init__` which computes the models and the app.
+        api = API.__new__(API)
+        api.logger = logging.getLogger(__name__)
         api.close = MagicMock()
         # API would run forever if we would not raise.
-        api.fastapi_app = MagicMock(side_effect=RuntimeError())
+        api.fastapi_app = self.RaisingApp()
 
         with pytest.raises(RuntimeError):
             api.run()
 
         assert api.close.called
 
-    def test_root_page_available(self):
+    def test_root_page_available(self, api_url, http):
         """
         The root page should serve the SwaggerUI page.
         """
-        test_api = API(**API_DEFAULT_KWARGS)
-        with APIInProcess(test_api) as base_url_root:
-            response = requests.get(f"{base_url_root}/")
+        response = http.get(f"{api_url}/")
 
         assert response.status_code == 200
 
 
-class PostEndpointTests:
-    """
-    Generic tests for `post_request` and `post_fit_parameters`.
-
-    This includes that the methods are wired up correctly to the FastAPI app.
-
-    Attributes:
-    -----------
-    endpoint : str
-        Corresponds to the `endpoint` argument of `GenericServiceClient`
-    valid_input_data_obj : dict
-        A piece of valid input data in object representation.
-    expected_result_jsonable : dict
-        The result that can be expected if `valid_input_data_obj` is used as
-        input for the corresponding task.
-    invalid_input_data_jsonable : dict
-        A piece of invalid input data in jsonable form.
-    expected_error_jsonable : dict
-        The body of the error message that is expected once
-        `invalid_input_data_jsonable` is used as input for the corresponding
-        task.
-    """
-
-    endpoint = None
-    valid_input_data_obj = None
-    expected_result_jsonable = None
-    invalid_input_data_jsonable = None
-    expected_error_jsonable = None
-
-    def test_task_ID_returned(self, dummy_tasks):
-        """
-        Check that calling the post endpoint returns an ID as expected.
-        """
-        api_kwargs = API_DEFAULT_KWARGS | dummy_tasks
-
-        if self.endpoint == "request":
-            InputModel = compute_request_input_model(
-                RequestArguments=DummyRequestArguments,
-                FittedParameters=DummyFittedParameters,
-            )
-        elif self.endpoint == "fit-parameters":
-            InputModel = compute_fit_parameters_input_model(
-                FitParameterArguments=DummyRequestArguments,
-                Observations=DummyObservations,
-            )
-        else:
-            raise RuntimeError("Invalid endpoint.")
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            client = GenericServiceClient(
-                base_url=f"{base_url_root}/",
-                endpoint=self.endpoint,
-                InputModel=InputModel,
-            )
-
-            # Raises if test API is not accessible.
-            client.check_connection()
-
-            # Check no other IDs are stored as this might make the test
-            # below pass although it might should fail.
-            assert len(client.task_ids) == 0
-
-            # This will fail (return a 500) if the API implementation of
-            # post_request does not work.
-            client.post_obj(self.valid_input_data_obj)
-
-            # Finally check that post request has returned a UUID although this
-            # should already been guaranteed by Client handling the response.
-            task_id = client.task_ids[0]
-            assert isinstance(task_id, UUID)
-
-    def test_task_created(self, dummy_tasks):
-        """
-        Verify that calling a post endpoint actually leads to the creation of a
-        celery task on the broker.
-        """
-        api_kwargs = API_DEFAULT_KWARGS | dummy_tasks
-        if self.endpoint == "request":
-            InputModel = compute_request_input_model(
-                RequestArguments=DummyRequestArguments,
-                FittedParameters=DummyFittedParameters,
-            )
-        elif self.endpoint == "fit-parameters":
-            InputModel = compute_fit_parameters_input_model(
-                FitParameterArguments=DummyRequestArguments,
-                Observations=DummyObservations,
-            )
-        else:
-            raise RuntimeError("Invalid endpoint.")
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            print(
-                "Test sets up Client with InputModel: "
-                f"{InputModel.model_json_schema()}"
-            )
-            client = GenericServiceClient(
-                base_url=f"{base_url_root}/",
-                endpoint=self.endpoint,
-                InputModel=InputModel,
-            )
-
-            # Raises if test API is not accessible.
-            client.check_connection()
-
-            # Check no other IDs are stored as this might make the test
-            # below pass although it might should fail.
-            assert len(client.task_ids) == 0
-
-            # This will fail (return a 500) if the API implementation of
-            # post_request does not work.
-            client.post_obj(self.valid_input_data_obj)
-
-            # Check that celery was able to process the task.
-            task_id = client.task_ids[0]
-            task = AsyncResult(str(task_id))
-            actual_result = json.loads(task.get(timeout=5, interval=0.1))
-            assert actual_result == self.expected_result_jsonable
-
-    def test_task_id_returned_once_existing(self, dummy_tasks):
-        """
-        There might be a race condition where the API returns an ID for a
-        task not yet processed by a worker. Requesting the status of this
-        task will yield a 404 if requested to fast. This checks that the
-        API only returns IDs for tasks that have already a state.
-        """
-        api_kwargs = API_DEFAULT_KWARGS | dummy_tasks
-        if self.endpoint == "request":
-            InputModel = compute_request_input_model(
-                RequestArguments=DummyRequestArguments,
-                FittedParameters=DummyFittedParameters,
-            )
-        elif self.endpoint == "fit-parameters":
-            InputModel = compute_fit_parameters_input_model(
-                FitParameterArguments=DummyRequestArguments,
-                Observations=DummyObservations,
-            )
-        else:
-            raise RuntimeError("Invalid endpoint.")
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            print(
-                "Test sets up Client with InputModel: "
-                f"{InputModel.model_json_schema()}"
-            )
-            client = GenericServiceClient(
-                base_url=f"{base_url_root}/",
-                endpoint=self.endpoint,
-                InputModel=InputModel,
-            )
-
-            # Raises if test API is not accessible.
-            client.check_connection()
-
-            # Check no other IDs are stored as this might make the test
-            # below pass although it might should fail.
-            assert len(client.task_ids) == 0
-
-            # This will fail (return a 500) if the API implementation of
-            # post_request does not work.
-            client.post_obj(self.valid_input_data_obj)
-
-            task_id = client.task_ids[0]
-            task = AsyncResult(str(task_id))
-
-            # Should not be pending, as this is mapped to 404.
-            assert task.state != states.PENDING
-
-    def test_input_checked(self, dummy_tasks):
-        """
-        Verify that calling `post_request` with body data not matching the
-        schema returns a 422 with adequate error details.
-
-        This test is necessary as `post_request` has short wired the part of
-        fastAPI that is responsible for this for the sake of generality and
-        saving few CPU cycles due to not needing to serialize to JSON again.
-        """
-        api_kwargs = API_DEFAULT_KWARGS | dummy_tasks
-
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            response = requests.post(
-                f"{base_url_root}/{self.endpoint}/",
-                json=self.invalid_input_data_jsonable,
-            )
-
-        assert response.status_code == 422
-
-        actual_error_body = response.json()
-        print(f"actual_error_body: {actual_error_body}")
-        print(f"expected_error_jsonable: {self.expected_error_jsonable}")
-        assert actual_error_body == self.expected_error_jsonable
-
-
-@pytest.mark.skipif(
-    service_extra_not_installed,
-    reason="requires installation with `service` extra.",
-)
-class TestPostRequest(PostEndpointTests):
-    """
-    Tests for `esg.service.api.API.post_request`.
-    """
-
-    endpoint = "request"
-    valid_input_data_obj = {
+# Test data for `TestPostEndpoints`, one dict per tested endpoint with keys:
+#   endpoint : Corresponds to the `endpoint` argument of
+#              `GenericServiceClient`.
+#   InputModel : The model the client uses to serialize
+#                `valid_input_data_obj`.
+#   valid_input_data_obj : A piece of valid input data in object
+#                          representation.
+#   expected_result_jsonable : The result that can be expected if
+#                              `valid_input_data_obj` is used as input for
+#                              the corresponding task.
+#   invalid_input_data_jsonable : A piece of invalid input data in jsonable
+#                                 form.
+#   expected_error_jsonable : The body of the error message that is expected
+#                             once `invalid_input_data_jsonable` is used as
+#                             input for the corresponding task. The
+#                             version specific pydantic documentation URLs
+#                             are omitted here.
+POST_REQUEST_CASE = {
+    "endpoint": "request",
+    "InputModel": compute_request_input_model(
+        RequestArguments=DummyRequestArguments,
+        FittedParameters=DummyFittedParameters,
+    ),
+    "valid_input_data_obj": {
         "arguments": {"argument_as_float": 123.4},
         "parameters": {"parameter_as_float": 78.9},
-    }
-    expected_result_jsonable = {
+    },
+    "expected_result_jsonable": {
         "argument_as_str": "123.4",
         "parameter_as_str": "78.9",
-    }
-    invalid_input_data_jsonable = {"arguments": {"noFieldInModel": "foo bar"}}
+    },
+    "invalid_input_data_jsonable": {
+        "arguments": {"noFieldInModel": "foo bar"}
+    },
     # This is the error we would typically expect from FastAPI.
     # It seems to be mostly the output of ValidationError.errors().
-    expected_error_jsonable = {
+    "expected_error_jsonable": {
         "detail": [
             {
                 "type": "missing",
                 "loc": ["arguments", "argument_as_float"],
                 "msg": "Field required",
                 "input": {"noFieldInModel": "foo bar"},
-                "url": (
-                    "https://errors.pydantic.dev/"
-                    f"{'.'.join(pydantic.__version__.split('.')[:2])}/v/missing"
-                ),
             },
             {
                 "type": "missing",
                 "loc": ["parameters"],
                 "msg": "Field required",
                 "input": {"arguments": {"noFieldInModel": "foo bar"}},
-                "url": (
-                    "https://errors.pydantic.dev/"
-                    f"{'.'.join(pydantic.__version__.split('.')[:2])}/v/missing"
-                ),
             },
         ]
-    }
-
-
-@pytest.mark.skipif(
-    service_extra_not_installed,
-    reason="requires installation with `service` extra.",
-)
-class TestPostFitParameters(PostEndpointTests):
-    """
-    Tests for `esg.service.api.API.post_fit_parameters`.
-    """
-
-    endpoint = "fit-parameters"
-    valid_input_data_obj = {
+    },
+}
+POST_FIT_PARAMETERS_CASE = {
+    "endpoint": "fit-parameters",
+    "InputModel": compute_fit_parameters_input_model(
+        FitParameterArguments=DummyRequestArguments,
+        Observations=DummyObservations,
+    ),
+    "valid_input_data_obj": {
         "arguments": {"argument_as_float": 123.4},
         "observations": {"argument_offset": 26.6},
-    }
-    expected_result_jsonable = {
+    },
+    "expected_result_jsonable": {
         "parameter_as_float": 150.0,
-    }
-    invalid_input_data_jsonable = {"arguments": {"noFieldInModel": "foo bar"}}
+    },
+    "invalid_input_data_jsonable": {
+        "arguments": {"noFieldInModel": "foo bar"}
+    },
     # This is the error we would typically expect from FastAPI.
     # It seems to be mostly the output of ValidationError.errors().
-    expected_error_jsonable = {
+    "expected_error_jsonable": {
         "detail": [
             {
                 "type": "missing",
                 "loc": ["arguments", "argument_as_float"],
                 "msg": "Field required",
                 "input": {"noFieldInModel": "foo bar"},
-                "url": (
-                    "https://errors.pydantic.dev/"
-                    f"{'.'.join(pydantic.__version__.split('.')[:2])}/v/missing"
-                ),
             },
             {
                 "type": "missing",
                 "loc": ["observations"],
                 "msg": "Field required",
                 "input": {"arguments": {"noFieldInModel": "foo bar"}},
-                "url": (
-                    "https://errors.pydantic.dev/"
-                    f"{'.'.join(pydantic.__version__.split('.')[:2])}/v/missing"
-                ),
             },
         ]
-    }
+    },
+}
 
 
-@pytest.fixture(scope="session")
-def execute_task_with_state(celery_session_app, celery_session_worker):
+@pytest.mark.integration
+@pytest.mark.skipif(
+    service_extra_not_installed,
+    reason="requires installation with `service` extra.",
+)
+class TestPostEndpoints:
     """
-    A task for testing that implements `esg.service.worker.execute_payload`.
+    Tests for `esg.service.api.API.post_request` and
+    `esg.service.api.API.post_fit_parameters`.
+
+    This includes that the methods are wired up correctly to the FastAPI app.
+    Every test is executed once per endpoint, see `POST_REQUEST_CASE` and
+    `POST_FIT_PARAMETERS_CASE` for the test data.
     """
 
-    @celery_session_app.task
-    def task_with_state(state):
-        current_task.update_state(state=state)
-        print(f"Task updated state to: {state}")
-        # Make celery not emit a SUCCESS state after returning.
-        raise Ignore()
+    @pytest.fixture(
+        scope="class",
+        params=[POST_REQUEST_CASE, POST_FIT_PARAMETERS_CASE],
+        ids=lambda case: case["endpoint"],
+    )
+    @classmethod
+    def case(cls, request):
+        """
+        The endpoint under test and the corresponding test data.
+        """
+        return request.param
 
-    celery_session_worker.reload()
+    @pytest.fixture(scope="class")
+    @classmethod
+    def shared_service_client(cls, api_url, case):
+        """
+        A client connected to `api_url` that is shared by all tests of
+        the endpoint, use `service_client` in tests.
+        """
+        # NOTE: The client calls `check_connection` on init and thus raises
+        #       here already if the test API is not accessible.
+        client = GenericServiceClient(
+            base_url=f"{api_url}/",
+            endpoint=case["endpoint"],
+            InputModel=case["InputModel"],
+        )
+        yield client
+
+    @pytest.fixture
+    def service_client(self, shared_service_client):
+        """
+        `shared_service_client` without any IDs stored by other tests, as
+        these might make tests pass that should fail.
+        """
+        shared_service_client.task_ids = []
+        return shared_service_client
+
+    def test_task_created(self, service_client, case):
+        """
+        Verify that calling a post endpoint returns a task ID and actually
+        leads to the creation of a celery task on the broker.
+        """
+        client = service_client
+
+        # This will fail (return a 500) if the API implementation of
+        # post_request does not work.
+        client.post_obj(case["valid_input_data_obj"])
+
+        # Check that post request has returned a UUID although this
+        # should already been guaranteed by Client handling the response.
+        task_id = client.task_ids[0]
+        assert isinstance(task_id, UUID)
+
+        # Check that celery was able to process the task.
+        task = AsyncResult(str(task_id))
+        actual_result = json.loads(task.get(timeout=5, interval=0.01))
+        assert actual_result == case["expected_result_jsonable"]
 
-    return task_with_state
+    def test_task_id_returned_once_existing(self, service_client, case):
+        """
+        There might be a race condition where the API returns an ID for a
+        task not yet processed by a worker. Requesting the status of this
+        task will yield a 404 if requested to fast. This checks that the
+        API only returns IDs for tasks that have already a state.
+        """
+        client = service_client
+
+        # This will fail (return a 500) if the API implementation of
+        # post_request does not work.
+        client.post_obj(case["valid_input_data_obj"])
+
+        task_id = client.task_ids[0]
+        task = AsyncResult(str(task_id))
+
+        # Should not be pending, as this is mapped to 404.
+        assert task.state != states.PENDING
+
+    def test_input_checked(self, api_url, case, http):
+        """
+        Verify that calling `post_request` with body data not matching the
+        schema returns a 422 with adequate error details.
+
+        This test is necessary as `post_request` has short wired the part of
+        fastAPI that is responsible for this for the sake of generality and
+        saving few CPU cycles due to not needing to serialize to JSON again.
+        """
+        response = http.post(
+            f"{api_url}/{case['endpoint']}/",
+            json=case["invalid_input_data_jsonable"],
+        )
+
+        assert response.status_code == 422
+
+        # Parse the raw bytes directly, this skips the encoding detection
+        # of `requests` which is not needed for JSON.
+        actual_error_body = json.loads(response.content)
+        # The documentation URL contains the pydantic version. Only check
+        # that it points to the pydantic docs to not break on upgrades.
+        for error in actual_error_body["detail"]:
+            url = error.pop("url")
+            assert url.startswith("https://errors.pydantic.dev/")
+        expected_error_body = case["expected_error_jsonable"]
+        logger.debug("actual_error_body: %s", actual_error_body)
+        logger.debug("expected_error_body: %s", expected_error_body)
+        assert actual_error_body == expected_error_body
+
+
+@pytest.fixture(scope="session")
+def execute_task_with_state(all_dummy_tasks):
+    """
+    A task for testing that implements `esg.service.worker.execute_payload`.
+    """
+    return all_dummy_tasks["task_with_state"]
 
 
 @pytest.fixture(scope="session")
-def execute_task_that_raises(celery_session_app, celery_session_worker):
+def execute_task_that_raises(all_dummy_tasks):
     """
     A task for testing that can raise an exception.
     """
+    return all_dummy_tasks["task_that_raises"]
+
+
+# Map the built in states of celery to the state definitions of service
+# framework. The internal states of celery are documented here:
+# https://docs.celeryq.dev/en/stable/userguide/tasks.html#task-states
+# The states are given as strings (the values of `celery.states`) as celery
+# is an optional dependency.
+# NOTE: There is an additional `states.REVOKED` status which is not
+#       considered here as the service framework has no functionality
+#       to cancel tasks. This might change in future.
+# NOTE: Celery matches an unknown ID to the pending state. PENDING is
+#       hence not included here.
+CELERY_STATUS_MAP = [
+    ("STARTED", "running"),
+    ("SUCCESS", "ready"),
+    ("FAILURE", "ready"),
+    ("RETRY", "queued"),
+]
+
+# An ID that is not known to celery, i.e. has state PENDING.
+RANDOM_TASK_ID = "12345678-1234-5678-1234-567812345678"
+
+# Names of exceptions that can be raised by `execute_task_that_raises`.
+TEST_EXCEPTIONS = [
+    "ValueError",
+    "GenericUnexpectedException",
+    "RequestInducedException",
+]
+
+# Map of celery states to the HTTP status codes the result endpoints should
+# return for tasks that have not finished successfully.
+CELERY_RESULT_STATUS_CODE_MAP = [
+    ("PENDING", 404),
+    ("STARTED", 409),
+    ("RETRY", 409),
+    ("FAILURE", 500),
+]
+
+
+@pytest.fixture(scope="module")
+def tasks_with_state(execute_task_with_state):
+    """
+    One task per celery state used in the tests above, indexed by state.
 
-    @celery_session_app.task
-    def task_that_raises(exception_name):
-        if exception_name == "ValueError":
-            raise ValueError()
-        if exception_name == "RequestInducedException":
-            raise RequestInducedException("The user fucked up.")
-        if exception_name == "GenericUnexpectedException":
-            raise GenericUnexpectedException()
+    All tasks are submitted at once, hence the worker can process them while
+    the first tests are already running.
+    """
+    celery_states = sorted(
+        {state for state, _ in CELERY_STATUS_MAP}
+        | {state for state, _ in CELERY_RESULT_STATUS_CODE_MAP}
+    )
+    return {
+        state: execute_task_with_state.delay(state) for state in celery_states
+    }
 
-    celery_session_worker.reload()
 
-    return task_that_raises
+@pytest.fixture(scope="module")
+def tasks_that_raised(execute_task_that_raises):
+    """
+    One task per entry of `TEST_EXCEPTIONS`, indexed by exception name.
+    """
+    return {
+        exception_name: execute_task_that_raises.delay(exception_name)
+        for exception_name in TEST_EXCEPTIONS
+    }
 
 
 class StatusEndpointTests:
@@ -1311,87 +1530,66 @@ class StatusEndpointTests:
 
     endpoint = None
 
-    def test_celery_states_matched(self, execute_task_with_state):
+    @pytest.mark.parametrize(
+        "celery_state, expected_task_status_text", CELERY_STATUS_MAP
+    )
+    def test_celery_states_matched(
+        self,
+        tasks_with_state,
+        api_url,
+        http,
+        celery_state,
+        expected_task_status_text,
+    ):
         """
         Checks that the celery internal states are matched to the states
         of the framework task status.
         """
-        # Map the built in states of celery to the state definitions of service
-        # framework. The internal states of celery are documented here:
-        # https://docs.celeryq.dev/en/stable/userguide/tasks.html#task-states
-        # NOTE: There is an additional `states.REVOKED` status which is not
-        #       considered here as the service framework has no functionality
-        #       to cancel tasks. This might change in future.
-        # NOTE: Celery matches an unknown ID to the pending state. PENDING is
-        #       hence not included here.
-        status_map = [
-            (states.STARTED, "running"),
-            (states.SUCCESS, "ready"),
-            (states.FAILURE, "ready"),
-            (states.RETRY, "queued"),
-        ]
-
-        api_kwargs = API_DEFAULT_KWARGS
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            for celery_state, expected_task_status_text in status_map:
-                print(f"Checking celery state: {celery_state}")
-                task = execute_task_with_state.delay(celery_state)
-                sleep(0.05)  # Give the task a little time to start
+        task = tasks_with_state[celery_state]
+        wait_for_state(task, [celery_state])
 
-                response = requests.get(
-                    f"{base_url_root}/{self.endpoint}/{task.id}/status/",
-                )
+        response = http.get(
+            f"{api_url}/{self.endpoint}/{task.id}/status/"
+        )
 
-                assert response.status_code == 200
+        assert response.status_code == 200
 
-                actual_task_status_text = response.json()["status_text"]
-                assert actual_task_status_text == expected_task_status_text
+        # FastAPI renders JSON without whitespace, hence a substring check
+        # is sufficient and saves parsing the body.
+        expected_snippet = f'"status_text":"{expected_task_status_text}"'
+        assert expected_snippet in response.text
 
-    def test_pending_raises_404(self):
+    def test_pending_raises_404(self, api_url, http):
         """
         Celeries PENDING states means that the ID is not known. This is
         should raise a 404.
         """
-        api_kwargs = API_DEFAULT_KWARGS
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            random_task_id = "12345678-1234-5678-1234-567812345678"
+        url = f"{api_url}/{self.endpoint}/{RANDOM_TASK_ID}/status/"
 
-            response = requests.get(
-                f"{base_url_root}/{self.endpoint}/{random_task_id}/status/",
-            )
-
-            assert response.status_code == 404
+        assert http.get(url).status_code == 404
 
-    def test_exceptions_match_finished(self, execute_task_that_raises):
+    @pytest.mark.parametrize("test_exception", TEST_EXCEPTIONS)
+    def test_exceptions_match_finished(
+        self, tasks_that_raised, api_url, http, test_exception
+    ):
         """
         By definition, an exception during task execution is mapped
         to mapped to the finished state as we the cause of the error
         is only made public when retrieving the result.
         """
-        test_exceptions = [
-            "ValueError",
-            "GenericUnexpectedException",
-            "RequestInducedException",
-        ]
-        api_kwargs = API_DEFAULT_KWARGS
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            for test_exception in test_exceptions:
-                print(f"Checking for exception: {test_exception}")
-                task = execute_task_that_raises.delay(test_exception)
-                sleep(0.05)  # Give the task a little time to start
-
-                response = requests.get(
-                    f"{base_url_root}/{self.endpoint}/{task.id}/status/",
-                )
+        task = tasks_that_raised[test_exception]
+        wait_for_state(task, [states.FAILURE])
 
-                assert response.status_code == 200
-                actual_task_status_text = response.json()["status_text"]
-                assert actual_task_status_text == "ready"
+        response = http.get(
+            f"{api_url}/{self.endpoint}/{task.id}/status/"
+        )
+
+        assert response.status_code == 200
+        # See `test_celery_states_matched` why this is sufficient.
+        assert '"status_text":"ready"' in response.text
 
 
+@pytest.mark.integration
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -1405,6 +1603,7 @@ class TestRequestStatus(StatusEndpointTests):
     endpoint = "request"
 
 
+@pytest.mark.integration
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -1442,34 +1641,59 @@ class ResultEndpointTests:
     expected_result_jsonable = None
     InvalidOutputModel = None
 
-    def test_status_codes_match_state(self, execute_task_with_state):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def result_client(cls, api_url):
         """
-        Check that non success states are mapped to the intended HTTP errors.
+        A client connected to `api_url` that is shared by all tests of
+        the class. Tests must set `task_ids` before using it.
         """
-        # The internal states of celery are documented here:
-        # https://docs.celeryq.dev/en/stable/userguide/tasks.html#task-states
-        status_map = [
-            (states.PENDING, 404),
-            (states.STARTED, 409),
-            (states.RETRY, 409),
-            (states.FAILURE, 500),
-        ]
+        # NOTE: The client calls `check_connection` on init and thus raises
+        #       here already if the test API is not accessible.
+        client = GenericServiceClient(
+            base_url=f"{api_url}/",
+            endpoint=cls.endpoint,
+            OutputModel=DummyRequestOutput,
+        )
+        yield client
 
-        api_kwargs = API_DEFAULT_KWARGS
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            for celery_state, expected_status_code in status_map:
-                print(f"Checking celery state: {celery_state}")
-                task = execute_task_with_state.delay(celery_state)
-                sleep(0.05)  # Give the task a little time to start
+    @pytest.fixture(scope="class")
+    @classmethod
+    def invalid_output_api_url(cls, serve_api):
+        """
+        Base URL of an API that uses `InvalidOutputModel` as output models.
 
-                response = requests.get(
-                    f"{base_url_root}/{self.endpoint}/{task.id}/result/",
-                )
+        Subclasses with the same `InvalidOutputModel` share the API.
+        """
+        return serve_api(
+            RequestOutput=cls.InvalidOutputModel,
+            FittedParameters=cls.InvalidOutputModel,
+        )
+
+    @pytest.mark.parametrize(
+        "celery_state, expected_status_code", CELERY_RESULT_STATUS_CODE_MAP
+    )
+    def test_status_codes_match_state(
+        self,
+        tasks_with_state,
+        api_url,
+        http,
+        celery_state,
+        expected_status_code,
+    ):
+        """
+        Check that non success states are mapped to the intended HTTP errors.
+        """
+        task = tasks_with_state[celery_state]
+        wait_for_state(task, [celery_state])
+
+        response = http.get(
+            f"{api_url}/{self.endpoint}/{task.id}/result/"
+        )
 
-                assert response.status_code == expected_status_code
+        assert response.status_code == expected_status_code
 
-    def test_task_output_returned(self, dummy_tasks):
+    def test_task_output_returned(self, dummy_tasks, result_client):
         """
         Check that the output of a task is returned by the endpoint.
         """
@@ -1479,31 +1703,23 @@ class ResultEndpointTests:
             dummy_task = dummy_tasks["fit_parameters_task"]
         else:
             raise ValueError(f"Encountered unknown endpoint: {self.endpoint}")
-        api_kwargs = API_DEFAULT_KWARGS
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            client = GenericServiceClient(
-                base_url=f"{base_url_root}/",
-                endpoint=self.endpoint,
-                OutputModel=DummyRequestOutput,
-            )
-
-            # Raises if test API is not accessible.
-            client.check_connection()
+        client = result_client
 
-            # Start the task.
-            task = dummy_task.delay(self.valid_input_data_json)
-            sleep(0.05)  # Give the task a little time to start
+        # Start the task.
+        task = dummy_task.delay(self.valid_input_data_json)
+        wait_for_state(task, [states.SUCCESS])
 
-            # Check no other IDs are stored as this might make the test
-            # below pass although it might should fail.
-            client.task_ids = [task.id]
+        # Check no other IDs are stored as this might make the test
+        # below pass although it might should fail.
+        client.task_ids = [task.id]
 
-            actual_result = client.get_results_jsonable()[0]
+        actual_result = client.get_results_jsonable()[0]
 
-            assert actual_result == self.expected_result_jsonable
+        assert actual_result == self.expected_result_jsonable
 
-    def test_task_output_checked(self, dummy_tasks):
+    def test_task_output_checked(
+        self, dummy_tasks, invalid_output_api_url, http
+    ):
         """
         Check that the output of is checked by the API, i.e. a 500 is
         returned if the content of provided by the task does not match
@@ -1515,41 +1731,34 @@ class ResultEndpointTests:
             dummy_task = dummy_tasks["fit_parameters_task"]
         else:
             raise ValueError(f"Encountered unknown endpoint: {self.endpoint}")
-        api_kwargs = API_DEFAULT_KWARGS | {
-            "RequestOutput": self.InvalidOutputModel,
-            "FittedParameters": self.InvalidOutputModel,
-        }
-
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            # Start the task.
-            task = dummy_task.delay(self.valid_input_data_json)
-            sleep(0.05)  # Give the task a little time to start
+        # Start the task.
+        task = dummy_task.delay(self.valid_input_data_json)
+        wait_for_state(task, [states.SUCCESS])
 
-            response = requests.get(
-                f"{base_url_root}/{self.endpoint}/{task.id}/result/",
-            )
+        response = http.get(
+            f"{invalid_output_api_url}/{self.endpoint}/{task.id}/result/",
+        )
 
-            assert response.status_code == 500
+        assert response.status_code == 500
 
-    def test_task_with_exception_yields_500(self, execute_task_that_raises):
+    def test_task_with_exception_yields_500(
+        self, execute_task_that_raises, api_url, http
+    ):
         """
         Check that a task that raises an exception is returned as 500.
         """
-        api_kwargs = API_DEFAULT_KWARGS
-        test_api = API(**api_kwargs)
-        with APIInProcess(test_api) as base_url_root:
-            # Start the task.
-            task = execute_task_that_raises.delay("ValueError")
-            sleep(0.05)  # Give the task a little time to start
+        # Start the task.
+        task = execute_task_that_raises.delay("ValueError")
+        wait_for_state(task, [states.FAILURE])
 
-            response = requests.get(
-                f"{base_url_root}/{self.endpoint}/{task.id}/result/",
-            )
+        response = http.get(
+            f"{api_url}/{self.endpoint}/{task.id}/result/",
+        )
 
-            assert response.status_code == 500
+        assert response.status_code == 500
 
 
+@pytest.mark.integration
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -1575,6 +1784,7 @@ class TestRequestResult(ResultEndpointTests):
     InvalidOutputModel = DummyRequestArguments
 
 
+@pytest.mark.integration
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -1608,17 +1818,11 @@ class TestFitParametersResult(ResultEndpointTests):
 
 
 @pytest.fixture(scope="session")
-def dummy_worker_task(celery_session_app, celery_session_worker):
-
-    @celery_session_app.task
-    def _dummy_worker_task(x, y):
-        return x * y
-
-    celery_session_worker.reload()
-
-    return _dummy_worker_task
+def dummy_worker_task(all_dummy_tasks):
+    return all_dummy_tasks["dummy_worker_task"]
 
 
+@pytest.mark.integration
 @pytest.mark.skipif(
     service_extra_not_installed,
     reason="requires installation with `service` extra.",
@@ -1629,4 +1833,4 @@ def test_celery_tests_work_at_all(dummy_worker_task):
     tests that relay on celery will likely too.
     """
 
-    assert dummy_worker_task.delay(4, 4).get(timeout=2) == 16
+    assert dummy_worker_task.delay(4, 4).get(timeout=2, interval=0.01) == 16
@@ -27,6 +27,8 @@ import pytest
 from esg.service.exceptions import GenericUnexpectedException
 from esg.service.exceptions import RequestInducedException
 
+pytestmark = pytest.mark.unit
+
 
 class TestGenericUnexpectedException:
     """
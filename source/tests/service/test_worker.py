@@ -19,15 +19,15 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
-import os
 import json
-from pathlib import Path
+import os
 
 from pydantic import BaseModel
+from pydantic import create_model
 from pydantic import ValidationError
 import pytest
+from typing_extensions import TypedDict
 from unittest.mock import patch
-from tempfile import TemporaryDirectory
 from typing import List
 
 # To prevent tests from failing if only parts of the package are used.
@@ -55,6 +55,30 @@ from data_model import handle_request
 from data_model import RequestArguments
 from data_model import RequestOutput
 
+pytestmark = pytest.mark.unit
+
+# Expected schemas of the `compute_*_input_model` functions. These are
+# computed once here to save generating the schemas in every test.
+# NOTE: The model names end up in the schemas and must hence match the
+#       names of the computed models.
+EXPECTED_REQUEST_INPUT_SCHEMA = create_model(
+    "RequestInput",
+    __base__=_BaseModel,
+    arguments=(RequestArguments, ...),
+    parameters=(FittedParameters, ...),
+).model_json_schema()
+EXPECTED_REQUEST_INPUT_ARGS_ONLY_SCHEMA = create_model(
+    "RequestInput",
+    __base__=_BaseModel,
+    arguments=(RequestArguments, ...),
+).model_json_schema()
+EXPECTED_FIT_PARAMETERS_INPUT_SCHEMA = create_model(
+    "FitParametersInput",
+    __base__=_BaseModel,
+    arguments=(FitParameterArguments, ...),
+    observations=(Observations, ...),
+).model_json_schema()
+
 
 @pytest.mark.skipif(
     service_extra_not_installed,
@@ -65,57 +89,50 @@ class TestCeleryAppFromEnviron:
     Tests for `esg.service.worker.celery_app_from_environ`.
     """
 
-    def test_no_name_raises(self):
-        """
-        Celery must have a name to prevent clashes if several services use the
-        same transport.
-        """
-        with patch.dict(os.environ, {}, clear=True):
-            with pytest.raises(ValueError) as exc_info:
-                celery_app_from_environ()
-
-            assert "CELERY__NAME" in str(exc_info.value)
-
-    def test_empty_fs_folder_raises(self):
+    @pytest.mark.parametrize(
+        "test_environ, expected_variable",
+        [
+            # Celery must have a name to prevent clashes if several services
+            # use the same transport.
+            ({}, "CELERY__NAME"),
+            # Can't have a filesystem transport if the corresponding folder
+            # is not created.
+            (
+                {
+                    "CELERY__NAME": "test",
+                    "CELERY__BROKER_URL": "filesystem://",
+                },
+                "CELERY__FS_TRANSPORT_BASE_FOLDER",
+            ),
+            # The broker URL is THE variable on which the app is configured.
+            # Thus, it can't be empty ...
+            ({"CELERY__NAME": "test"}, "CELERY__BROKER_URL"),
+            # ... and must take one of the well defined values.
+            (
+                {
+                    "CELERY__NAME": "test",
+                    "CELERY__BROKER_URL": "definitely not supported",
+                },
+                "CELERY__BROKER_URL",
+            ),
+        ],
+        ids=[
+            "no_name",
+            "empty_fs_folder",
+            "empty_broker_url",
+            "unknown_broker_url",
+        ],
+    )
+    def test_invalid_environ_raises(self, test_environ, expected_variable):
+        """
+        Invalid or missing environment variables should raise an error that
+        names the offending variable.
         """
-        Can't have a filesystem transport if the corresponding folder is not
-        created.
-        """
-        test_environ = {
-            "CELERY__NAME": "test",
-            "CELERY__BROKER_URL": "filesystem://",
-        }
         with patch.dict(os.environ, test_environ, clear=True):
             with pytest.raises(ValueError) as exc_info:
                 celery_app_from_environ()
-            assert "CELERY__FS_TRANSPORT_BASE_FOLDER" in str(exc_info.value)
 
-    def test_empty_broker_url_raises(self):
-        """
-        The broker URL is THE variable on which the app is configured. Thus,
-        it can't be empty.
-        """
-        test_environ = {
-            "CELERY__NAME": "test",
-        }
-        with patch.dict(os.environ, test_environ, clear=True):
-            with pytest.raises(ValueError) as exc_info:
-                celery_app_from_environ()
-            assert "CELERY__BROKER_URL" in str(exc_info.value)
-
-    def test_unknown_broker_url_raises(self):
-        """
-        The broker URL is THE variable on which the app is configured. Thus,
-        it must take one of the well defined values.
-        """
-        test_environ = {
-            "CELERY__NAME": "test",
-            "CELERY__BROKER_URL": "definitely not supported",
-        }
-        with patch.dict(os.environ, test_environ, clear=True):
-            with pytest.raises(ValueError) as exc_info:
-                celery_app_from_environ()
-            assert "CELERY__BROKER_URL" in str(exc_info.value)
+        assert expected_variable in str(exc_info.value)
 
     @staticmethod
     def verify_generic_options_in_app(app):
@@ -126,46 +143,45 @@ class TestCeleryAppFromEnviron:
         assert app.conf.broker_connection_retry_on_startup is True
         assert app.conf.task_track_started is True
 
-    def test_fs_transport_creates_folders_and_returns_app(self):
+    def test_fs_transport_creates_folders_and_returns_app(self, tmp_path):
         """
         This is the desired aspect for filesystem transport, that the folders
         are created and the app configured.
         """
-        with TemporaryDirectory() as tmp_dir:
-
-            # Check that the folders exist not yet
-            tmp_dir_path = Path(tmp_dir)
-            broker_path = tmp_dir_path / "broker"
-            results_path = tmp_dir_path / "results"
-            assert broker_path.is_dir() is False
-            assert results_path.is_dir() is False
-
-            test_environ = {
-                "CELERY__NAME": "test_name",
-                "CELERY__BROKER_URL": "filesystem://",
-                "CELERY__FS_TRANSPORT_BASE_FOLDER": tmp_dir,
-            }
-            with patch.dict(os.environ, test_environ, clear=True):
-                app = celery_app_from_environ()
-
-            # Check that the folders have been created.
-            assert broker_path.is_dir()
-            assert results_path.is_dir()
-
-            # Check that we have received a Celery app.
-            assert isinstance(app, Celery)
-
-            # Check that the expected settings have been set.
-            assert app.main == "test_name"
-            assert app.conf.broker_url == "filesystem://"
-            assert app.conf.broker_transport_options == {
-                "data_folder_in": f"{broker_path}/",
-                "data_folder_out": f"{broker_path}/",
-            }
-            assert app.conf.result_backend == f"file://{results_path}/"
-
-            # Finally, check for the generic options.
-            self.verify_generic_options_in_app(app)
+        tmp_dir = str(tmp_path)
+        broker_path = tmp_path / "broker"
+        results_path = tmp_path / "results"
+
+        # Check that the folders exist not yet
+        assert broker_path.is_dir() is False
+        assert results_path.is_dir() is False
+
+        test_environ = {
+            "CELERY__NAME": "test_name",
+            "CELERY__BROKER_URL": "filesystem://",
+            "CELERY__FS_TRANSPORT_BASE_FOLDER": tmp_dir,
+        }
+        with patch.dict(os.environ, test_environ, clear=True):
+            app = celery_app_from_environ()
+
+        # Check that the folders have been created.
+        assert broker_path.is_dir()
+        assert results_path.is_dir()
+
+        # Check that we have received a Celery app.
+        assert isinstance(app, Celery)
+
+        # Check that the expected settings have been set.
+        assert app.main == "test_name"
+        assert app.conf.broker_url == "filesystem://"
+        assert app.conf.broker_transport_options == {
+            "data_folder_in": f"{broker_path}/",
+            "data_folder_out": f"{broker_path}/",
+        }
+        assert app.conf.result_backend == f"file://{results_path}/"
+
+        # Finally, check for the generic options.
+        self.verify_generic_options_in_app(app)
 
     def test_amqp_returns_app(self):
         """
@@ -227,12 +243,7 @@ class TestComputeRequestInputModel:
         """
         Check that the model is correct if both args are provided.
         """
-
-        class RequestInput(_BaseModel):
-            arguments: RequestArguments
-            parameters: FittedParameters
-
-        expected_schema = RequestInput.model_json_schema()
+        expected_schema = EXPECTED_REQUEST_INPUT_SCHEMA
 
         ActualModel = compute_request_input_model(
             RequestArguments=RequestArguments,
@@ -246,11 +257,7 @@ class TestComputeRequestInputModel:
         """
         Check that the model is correct if only request args model is provided.
         """
-
-        class RequestInput(_BaseModel):
-            arguments: RequestArguments
-
-        expected_schema = RequestInput.model_json_schema()
+        expected_schema = EXPECTED_REQUEST_INPUT_ARGS_ONLY_SCHEMA
 
         ActualModel = compute_request_input_model(
             RequestArguments=RequestArguments
@@ -259,6 +266,21 @@ class TestComputeRequestInputModel:
 
         assert actual_schema == expected_schema
 
+    def test_model_cached(self):
+        """
+        The model should be computed only once per combination of models.
+        """
+        ActualModel1 = compute_request_input_model(
+            RequestArguments=RequestArguments,
+            FittedParameters=FittedParameters,
+        )
+        ActualModel2 = compute_request_input_model(
+            RequestArguments=RequestArguments,
+            FittedParameters=FittedParameters,
+        )
+
+        assert ActualModel1 is ActualModel2
+
 
 class TestComputeFitParametersInputModel:
     """
@@ -269,12 +291,7 @@ class TestComputeFitParametersInputModel:
         """
         Check that the model is correct for the standard case.
         """
-
-        class FitParametersInput(_BaseModel):
-            arguments: FitParameterArguments
-            observations: Observations
-
-        expected_schema = FitParametersInput.model_json_schema()
+        expected_schema = EXPECTED_FIT_PARAMETERS_INPUT_SCHEMA
 
         ActualModel = compute_fit_parameters_input_model(
             FitParameterArguments=FitParameterArguments,
@@ -284,6 +301,21 @@ class TestComputeFitParametersInputModel:
 
         assert actual_schema == expected_schema
 
+    def test_model_cached(self):
+        """
+        The model should be computed only once per combination of models.
+        """
+        ActualModel1 = compute_fit_parameters_input_model(
+            FitParameterArguments=FitParameterArguments,
+            Observations=Observations,
+        )
+        ActualModel2 = compute_fit_parameters_input_model(
+            FitParameterArguments=FitParameterArguments,
+            Observations=Observations,
+        )
+
+        assert ActualModel1 is ActualModel2
+
 
 class TestExecutePayload:
     """
@@ -298,10 +330,7 @@ class TestExecutePayload:
 
     @staticmethod
     def demo_payload_function(input_data):
-        _sum = 0
-        for i in input_data.ints:
-            _sum += i
-        return {"sum": _sum}
+        return {"sum": sum(input_data.ints)}
 
     def test_end_to_end(self):
         """
@@ -311,8 +340,9 @@ class TestExecutePayload:
           * the payload function is called.
           * the output is serialized.
         """
-        input_data_json = json.dumps({"ints": [1, 2, 3, 4]})
-        expected_output_data_jsonable = {"sum": 10}
+        # The API forwards the raw request body, i.e. bytes.
+        input_data_json = b'{"ints": [1, 2, 3, 4]}'
+        expected_output_data = {"sum": 10}
 
         actual_output_data_json = execute_payload(
             input_data_json=input_data_json,
@@ -320,15 +350,102 @@ class TestExecutePayload:
             payload_function=self.demo_payload_function,
             OutputDataModel=self.DemoOutputDataModel,
         )
-        actual_output_data_jsonable = json.loads(actual_output_data_json)
+        actual_output_data = json.loads(actual_output_data_json)
 
-        assert actual_output_data_jsonable == expected_output_data_jsonable
+        assert actual_output_data == expected_output_data
+
+    def test_typed_dict_models_supported(self):
+        """
+        Verify that `TypedDict`s can be used instead of pydantic models.
+        """
+
+        class DemoInputDataDict(TypedDict):
+            ints: List[int]
+
+        class DemoOutputDataDict(TypedDict):
+            sum: int
+
+        def demo_payload_function_dict(input_data):
+            return {"sum": sum(input_data["ints"])}
+
+        input_data_json = b'{"ints": [1, 2, 3, 4]}'
+        expected_output_data = {"sum": 10}
+
+        actual_output_data_json = execute_payload(
+            input_data_json=input_data_json,
+            InputDataModel=DemoInputDataDict,
+            payload_function=demo_payload_function_dict,
+            OutputDataModel=DemoOutputDataDict,
+        )
+        actual_output_data = json.loads(actual_output_data_json)
+
+        assert actual_output_data == expected_output_data
+
+    def test_output_validation_skippable(self):
+        """
+        Verify that the output is serialized as usual if validation of the
+        output is disabled.
+        """
+        input_data_json = b'{"ints": [1, 2, 3, 4]}'
+        expected_output_data = {"sum": 10}
+
+        actual_output_data_json = execute_payload(
+            input_data_json=input_data_json,
+            InputDataModel=self.DemoInputDataModel,
+            payload_function=self.demo_payload_function,
+            OutputDataModel=self.DemoOutputDataModel,
+            validate_output=False,
+        )
+        actual_output_data = json.loads(actual_output_data_json)
+
+        assert actual_output_data == expected_output_data
+
+    def test_output_not_validated_if_skipped(self):
+        """
+        Verify that non conform output passes if validation is disabled,
+        else validation might still be running.
+        """
+        input_data_json = b'{"ints": [1, 2, 3, 4]}'
+
+        def payload_function_non_conform_output(input_data):
+            return {"sum": "not an int"}
+
+        actual_output_data_json = execute_payload(
+            input_data_json=input_data_json,
+            InputDataModel=self.DemoInputDataModel,
+            payload_function=payload_function_non_conform_output,
+            OutputDataModel=self.DemoOutputDataModel,
+            validate_output=False,
+        )
+
+        assert json.loads(actual_output_data_json) == {"sum": "not an int"}
+
+    @pytest.mark.parametrize("validate_output", [True, False])
+    def test_output_model_instance_accepted(self, validate_output):
+        """
+        The payload function may return an instance of `OutputDataModel`
+        instead of a dict.
+        """
+        input_data_json = b'{"ints": [1, 2, 3, 4]}'
+
+        def payload_function_model_output(input_data):
+            return self.DemoOutputDataModel(sum=sum(input_data.ints))
+
+        actual_output_data_json = execute_payload(
+            input_data_json=input_data_json,
+            InputDataModel=self.DemoInputDataModel,
+            payload_function=payload_function_model_output,
+            OutputDataModel=self.DemoOutputDataModel,
+            validate_output=validate_output,
+        )
+
+        assert json.loads(actual_output_data_json) == {"sum": 10}
 
     def test_input_data_model_used(self):
         """
         Verify that the `InputDataModel` is utilized.
         """
-        input_data_json = json.dumps({"ints": "not an int"})
+        input_data_json = b'{"ints": "not an int"}'
 
         with pytest.raises(ValidationError):
             _ = execute_payload(
@@ -342,7 +459,7 @@ class TestExecutePayload:
         """
         Verify that the `OutputDataModel` is utilized.
         """
-        input_data_json = json.dumps({"ints": [1, 2, 3, 4]})
+        input_data_json = b'{"ints": [1, 2, 3, 4]}'
 
         def payload_function_non_conform_output(input_data):
             return {"sum": "not an int"}
@@ -366,8 +483,8 @@ class TestInvokeHandleRequest:
         Test `invoke_handle_request` with a practical example. The edge
         cases should already be handled by the tests for `execute_payload`.
         """
-        input_data_json = json.dumps({"arguments": {"ints": [1, 2, 3, 4]}})
-        expected_output_data_jsonable = {"weighted_sum": 10}
+        input_data_json = b'{"arguments": {"ints": [1, 2, 3, 4]}}'
+        expected_output_data = {"weighted_sum": 10}
 
         actual_output_data_json = invoke_handle_request(
             input_data_json=input_data_json,
@@ -375,22 +492,20 @@ class TestInvokeHandleRequest:
             handle_request_function=handle_request,
             RequestOutput=RequestOutput,
         )
-        actual_output_data_jsonable = json.loads(actual_output_data_json)
+        actual_output_data = json.loads(actual_output_data_json)
 
-        assert actual_output_data_jsonable == expected_output_data_jsonable
+        assert actual_output_data == expected_output_data
 
     def test_with_parameters(self):
         """
         Test `invoke_handle_request` with a practical example. The edge
         cases should already be handled by the tests for `execute_payload`.
         """
-        input_data_json = json.dumps(
-            {
-                "arguments": {"ints": [1, 2, 3, 4]},
-                "parameters": {"weights": [1, 2, 1, 1]},
-            },
+        input_data_json = (
+            b'{"arguments": {"ints": [1, 2, 3, 4]}, '
+            b'"parameters": {"weights": [1, 2, 1, 1]}}'
         )
-        expected_output_data_jsonable = {"weighted_sum": 12}
+        expected_output_data = {"weighted_sum": 12}
 
         actual_output_data_json = invoke_handle_request(
             input_data_json=input_data_json,
@@ -399,9 +514,30 @@ class TestInvokeHandleRequest:
             handle_request_function=handle_request,
             RequestOutput=RequestOutput,
         )
-        actual_output_data_jsonable = json.loads(actual_output_data_json)
+        actual_output_data = json.loads(actual_output_data_json)
+
+        assert actual_output_data == expected_output_data
+
+    @pytest.mark.parametrize("n_ints", [1_000, 10_000])
+    def test_scales(self, n_ints):
+        """
+        Check that `invoke_handle_request` works for larger inputs too.
+        """
+        # Build the JSON directly, this is much cheaper than `json.dumps`
+        # and doesn't require numpy.
+        ints_json = ",".join(map(str, range(n_ints))).encode()
+        input_data_json = b'{"arguments": {"ints": [' + ints_json + b"]}}"
+        expected_output_data = {"weighted_sum": n_ints * (n_ints - 1) // 2}
+
+        actual_output_data_json = invoke_handle_request(
+            input_data_json=input_data_json,
+            RequestArguments=RequestArguments,
+            handle_request_function=handle_request,
+            RequestOutput=RequestOutput,
+        )
+        actual_output_data = json.loads(actual_output_data_json)
 
-        assert actual_output_data_jsonable == expected_output_data_jsonable
+        assert actual_output_data == expected_output_data
 
 
 class TestInvokeFitParameters:
@@ -414,13 +550,11 @@ class TestInvokeFitParameters:
         Test `invoke_fit_parameters` with a practical example. The edge
         cases should already be handled by the tests for `execute_payload`.
         """
-        input_data_json = json.dumps(
-            {
-                "arguments": [{"ints": [1, 2, 3, 4]}, {"ints": [6, 7, 8, 9]}],
-                "observations": [{"weighted_sum": 30}, {"weighted_sum": 80}],
-            },
+        input_data_json = (
+            b'{"arguments": [{"ints": [1, 2, 3, 4]}, {"ints": [6, 7, 8, 9]}], '
+            b'"observations": [{"weighted_sum": 30}, {"weighted_sum": 80}]}'
         )
-        expected_output_data_jsonable = {"weights": [1, 2, 3, 4]}
+        expected_output_data = {"weights": [1, 2, 3, 4]}
         actual_output_data_json = invoke_fit_parameters(
             input_data_json=input_data_json,
             FitParameterArguments=FitParameterArguments,
@@ -428,6 +562,6 @@ class TestInvokeFitParameters:
             fit_parameters_function=fit_parameters,
             FittedParameters=FittedParameters,
         )
-        actual_output_data_jsonable = json.loads(actual_output_data_json)
+        actual_output_data = json.loads(actual_output_data_json)
 
-        assert actual_output_data_jsonable == expected_output_data_jsonable
+        assert actual_output_data == expected_output_data
@@ -17,9 +17,31 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
+import socket
+import threading
+from time import sleep
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+import pytest
+import requests
+
+from esg.test import tools
+from esg.test.tools import APIInProcess
 from esg.test.tools import copy_test_data
 
+try:
+    from celery import Celery
+    from celery import current_app as celery_current_app
+    from celery.result import AsyncResult
+    import uvicorn  # NOQA
+
+    service_extra_not_installed = False
+except ModuleNotFoundError:
+    service_extra_not_installed = True
 
+
+@pytest.mark.unit
 class TestCopyTestData:
     """
     Tests for esg.test.tools.copy_test_data
@@ -145,3 +167,128 @@ class TestCopyTestData:
         ]
 
         assert actual_data_copy == expected_data_copy
+
+
+class _DummyAPI:
+    """
+    Provides the attributes `APIInProcess` uses of `esg.service.api.API`.
+    """
+
+    def __init__(self):
+        self.fastapi_app = FastAPI()
+        self.fastapi_app.get("/")(lambda: {})
+        self.close = MagicMock()
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    service_extra_not_installed,
+    reason="requires installation with `service` extra.",
+)
+class TestAPIInProcess:
+    """
+    Tests for esg.test.tools.APIInProcess
+    """
+
+    def test_port_read_back(self):
+        """
+        The port selected by the OS must be read back and used in the URL.
+        """
+        api_in_process = APIInProcess(_DummyAPI(), port=0)
+        with api_in_process as base_url_root:
+            assert api_in_process.port != 0
+            assert base_url_root == f"http://127.0.0.1:{api_in_process.port}"
+            response = requests.get(base_url_root + "/")
+            assert response.status_code == 200
+
+    def test_clean_shutdown_on_exit(self):
+        """
+        After exiting the server must be stopped and the port released.
+        The API is owned by the caller and must hence not be closed.
+        """
+        api = _DummyAPI()
+        api_in_process = APIInProcess(api)
+        with api_in_process:
+            pass
+
+        assert not api_in_process.thread.is_alive()
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            assert s.connect_ex(("127.0.0.1", api_in_process.port)) != 0
+        api.close.assert_not_called()
+
+    def test_api_can_be_served_repeatedly(self):
+        """
+        Like `GenericAPITest` does with the same API instance.
+        """
+        api = _DummyAPI()
+        for _ in range(2):
+            with APIInProcess(api) as base_url_root:
+                response = requests.get(base_url_root + "/")
+                assert response.status_code == 200
+
+    def test_failed_startup_raises(self):
+        """
+        uvicorn terminates if the port is in use, which must be reported.
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            s.listen()
+            used_port = s.getsockname()[1]
+
+            api_in_process = APIInProcess(_DummyAPI(), port=used_port)
+            with pytest.raises(RuntimeError) as exc_info:
+                with api_in_process:
+                    pass
+
+        # The reason is kept, and doesn't escape the thread unhandled.
+        assert isinstance(exc_info.value.__cause__, SystemExit)
+
+    def test_celery_app_used_in_server_thread(self):
+        """
+        The API fetches task states with `AsyncResult`, which uses the
+        current celery app. The latter is thread local and must hence be
+        the same in the server thread as in the calling thread.
+        """
+        celery_app = Celery(backend="cache+memory://", set_as_current=False)
+        previous_app = celery_current_app._get_current_object()
+        celery_app.set_current()
+        try:
+            api = _DummyAPI()
+
+            # Async like the endpoints of `API`, i.e. executed in the
+            # thread of the event loop.
+            @api.fastapi_app.get("/state/")
+            async def get_state():
+                return {"state": AsyncResult("not-existing-task").state}
+
+            with APIInProcess(api) as base_url_root:
+                response = requests.get(base_url_root + "/state/")
+        finally:
+            previous_app.set_current()
+
+        # Would be a 500 if the default app without backend was used.
+        assert response.status_code == 200
+        assert response.json() == {"state": "PENDING"}
+
+    def test_startup_timeout_raises(self):
+        """
+        A server that doesn't start in time must be reported too.
+        """
+        api_in_process = APIInProcess(_DummyAPI())
+        # A thread that is alive but never starts the server.
+        api_in_process.thread = threading.Thread(
+            target=sleep, args=(1,), daemon=True
+        )
+        api_in_process.thread.start()
+
+        with pytest.raises(RuntimeError):
+            api_in_process.wait_until_started(timeout=0.05)
+
+    def test_missing_uvicorn_raises(self, monkeypatch):
+        """
+        Fail with a helpful message rather than an AttributeError.
+        """
+        monkeypatch.setattr(tools, "uvicorn", None)
+
+        with pytest.raises(ModuleNotFoundError, match="uvicorn"):
+            APIInProcess(_DummyAPI())
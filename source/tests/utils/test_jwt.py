@@ -19,9 +19,7 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
-from datetime import datetime
-from datetime import timedelta
-from datetime import timezone
+from time import time
 
 import jwt
 from pydantic import ValidationError
@@ -29,8 +27,8 @@ import pytest
 
 from esg.utils.jwt import AccessTokenChecker
 from esg.test.jwt_utils import RSA256_KEY
-from esg.test.jwt_utils import RSA256_PRIVATE_KEY
-from esg.test.jwt_utils import INVALID_RSA_PRIVATE_KEY
+
+pytestmark = pytest.mark.unit
 
 # Sane default kwargs for testing `AccessTokenChecker`.
 ATC_DEFAULT_KWARGS = {
@@ -38,19 +36,63 @@ ATC_DEFAULT_KWARGS = {
     "expected_audience": "some_client_id",
 }
 
+# Additional kwargs for testing the role checking of `AccessTokenChecker`.
+ATC_ROLE_KWARGS = {
+    "expected_role_claim": [
+        "resource_access",
+        "keycloak-client",
+        "roles",
+    ],
+    "expected_roles": [
+        "demo-service:permission_1",
+        "demo-service:permission_2",
+        "demo-service:permission_3",
+    ],
+}
+
+
+@pytest.fixture(scope="session")
+def atc_default_kwargs(openid_like_test_idp_session):
+    """
+    `ATC_DEFAULT_KWARGS` with the issuer of `openid_like_test_idp_session`.
+
+    NOTE: This is shared between tests. Don't modify it, merge it into
+          a new dict instead.
+    """
+    issuer = openid_like_test_idp_session[1]
+    return ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
+
+
+@pytest.fixture(scope="module")
+def atc_default(atc_default_kwargs):
+    """
+    An `AccessTokenChecker` with default arguments for
+    `openid_like_test_idp_session`.
+
+    Shared by all tests that don't need other arguments, this saves fetching
+    the OIDC configuration for every test.
+    """
+    return AccessTokenChecker(**atc_default_kwargs)
+
+
+@pytest.fixture(scope="module")
+def atc_with_roles(atc_default_kwargs):
+    """
+    Like `atc_default` but with role checking, see `ATC_ROLE_KWARGS`.
+    """
+    return AccessTokenChecker(**(atc_default_kwargs | ATC_ROLE_KWARGS))
+
 
 class TestAccessTokenCheckerInit:
     """
     Tests for `esg.utils.jwt.AccessTokenChecker.__init__`
     """
 
-    def test_attributes_available(self, openid_like_test_idp):
+    def test_attributes_available(self, atc_default_kwargs):
         """
         Verify that the relevant arguments are stored as attributes.
         """
-        issuer = openid_like_test_idp[1]
-        atc_kwargs = ATC_DEFAULT_KWARGS | {
-            "expected_issuer": issuer,
+        atc_kwargs = atc_default_kwargs | {
             "expected_role_claim": ["test"],
             "expected_roles": ["test:ro", "test:rw"],
         }
@@ -77,14 +119,19 @@ class TestAccessTokenCheckerInit:
         """
         This validates that init creates the JWKS client required
         later for retrieving the keys for validating the JWTs.
-        """
-        issuer = openid_like_test_idp[1]
 
+        NOTE: This uses the function scoped `openid_like_test_idp` on
+              purpose, to keep the public fixture covered. Its one-shot
+              handlers also verify that the configuration and the keys
+              are fetched only once.
+        """
+        httpserver, issuer = openid_like_test_idp
         atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
         atc = AccessTokenChecker(**atc_kwargs)
 
         # Check that we can fetch the RSA public key from using the JWKS client.
         atc.jwks_client.get_signing_key(kid=RSA256_KEY["kid"])
+        httpserver.check_assertions()
 
     def test_expected_roles_cannot_be_empty(self):
         """
@@ -115,13 +162,14 @@ class TestAccessTokenCheckerGetWellKnownURL:
     Tests for `esg.utils.jwt.AccessTokenChecker.get_well_known_url`
     """
 
-    def test_expected_url_returned(self, openid_like_test_idp):
+    def test_expected_url_returned(
+        self, openid_like_test_idp_session, atc_default_kwargs
+    ):
         """
         Simplest case, check that the expected URL is returned.
         """
-        issuer = openid_like_test_idp[1]
-        atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
-        atc = AccessTokenChecker(**atc_kwargs)
+        issuer = openid_like_test_idp_session[1]
+        atc = AccessTokenChecker(**atc_default_kwargs)
 
         expected_url = f"{issuer}/.well-known/openid-configuration"
         actual_url = atc.get_well_known_url()
@@ -134,84 +182,88 @@ class TestAccessTokenCheckerCheckToken:
     Tests for `esg.utils.jwt.AccessTokenChecker.check_token`
     """
 
-    def _generate_payload(self, issuer):
+    @staticmethod
+    def _generate_payload(issuer):
         """
         Helper function. Generates the expected content of the JWT.
         """
+        # NOTE: JWTs store timestamps as seconds since epoch anyway.
+        now = int(time())
         payload = {
             "iss": issuer,
             "aud": [ATC_DEFAULT_KWARGS["expected_audience"], "some other aud"],
-            "iat": datetime.now(tz=timezone.utc) - timedelta(seconds=60),
-            "exp": datetime.now(tz=timezone.utc) + timedelta(seconds=60),
+            "iat": now - 60,
+            "exp": now + 60,
             "sub": "18e72351-7d97-4c56-b593-038be8e00d2b",
         }
         return payload
 
-    def test_valid_token_passes(self, openid_like_test_idp):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def valid_token(cls, rsa_private_key, openid_like_test_idp_session):
         """
-        Check that a valid JWT is checked as OK, i.e. `check_token` does not
-        raise.
+        A valid token matching `atc_default`, signed once for all tests
+        that don't need to modify the claims.
         """
-        issuer = openid_like_test_idp[1]
-
+        issuer = openid_like_test_idp_session[1]
         token = jwt.encode(
-            self._generate_payload(issuer),
+            cls._generate_payload(issuer),
             algorithm="RS256",
-            key=RSA256_PRIVATE_KEY,
+            key=rsa_private_key,
             headers={"kid": RSA256_KEY["kid"]},
         )
+        return token
 
-        atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
-        atc = AccessTokenChecker(**atc_kwargs)
-        _ = atc.check_token(token=token)
+    def test_valid_token_passes(self, valid_token, atc_default):
+        """
+        Check that a valid JWT is checked as OK, i.e. `check_token` does not
+        raise.
+        """
+        _ = atc_default.check_token(token=valid_token)
 
-    def test_sub_returned(self, openid_like_test_idp):
+    def test_sub_returned(
+        self, openid_like_test_idp_session, valid_token, atc_default
+    ):
         """
         Check that the sub value is extracted from the token.
         """
-        issuer = openid_like_test_idp[1]
-        payload = self._generate_payload(issuer)
-        expected_sub_value = payload["sub"]
+        issuer = openid_like_test_idp_session[1]
+        expected_sub_value = self._generate_payload(issuer)["sub"]
 
-        token = jwt.encode(
-            payload,
-            algorithm="RS256",
-            key=RSA256_PRIVATE_KEY,
-            headers={"kid": RSA256_KEY["kid"]},
-        )
-
-        atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
-        atc = AccessTokenChecker(**atc_kwargs)
-        actual_sub_value, _ = atc.check_token(token=token)
+        actual_sub_value, _ = atc_default.check_token(token=valid_token)
 
         assert actual_sub_value == expected_sub_value
 
-    def test_token_with_invalid_signature_raises(self, openid_like_test_idp):
+    def test_token_with_invalid_signature_raises(
+        self,
+        openid_like_test_idp_session,
+        atc_default,
+        invalid_rsa_private_key,
+    ):
         """
         Verify that a access token signed with the wrong key is detected.
         """
-        issuer = openid_like_test_idp[1]
+        issuer = openid_like_test_idp_session[1]
         token = jwt.encode(
             self._generate_payload(issuer),
             algorithm="RS256",
-            key=INVALID_RSA_PRIVATE_KEY,
+            key=invalid_rsa_private_key,
             headers={"kid": RSA256_KEY["kid"]},
         )
 
-        atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
-        atc = AccessTokenChecker(**atc_kwargs)
-
         with pytest.raises(jwt.exceptions.InvalidSignatureError):
-            atc.check_token(token=token)
+            atc_default.check_token(token=token)
 
-    def test_token_reusing_RSA_public_key_raises(self, openid_like_test_idp):
+    def test_token_reusing_RSA_public_key_raises(
+        self, openid_like_test_idp_session, atc_default
+    ):
         """
         One hacking trick to fake valid JWT signatures is to sign a JWT with a
         valid kid of and the public key of a RS256 algorithm but with HS256.
         See here for details:
         https://auth0.com/blog/critical-vulnerabilities-in-json-web-token-libraries/
         """
-        issuer = openid_like_test_idp[1]
+        issuer = openid_like_test_idp_session[1]
         token = jwt.encode(
             self._generate_payload(issuer),
             algorithm="HS256",
@@ -219,124 +271,112 @@ class TestAccessTokenCheckerCheckToken:
             headers={"kid": RSA256_KEY["kid"]},
         )
 
-        atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
-        atc = AccessTokenChecker(**atc_kwargs)
-
         with pytest.raises(Exception):
             # NOTE: This raises no clean exception but some internal of PyJWT
             # seems to fail once requested to load a RSA key with the mechanism
             # for a symmetric key. Beyond that there seems no checking if the
             # KID actually matches the algorithm.
-            atc.check_token(token=token)
+            atc_default.check_token(token=token)
 
-    def test_missing_claims_raise(self, openid_like_test_idp):
+    @pytest.mark.parametrize("claim", ["iss", "iat", "exp", "aud", "sub"])
+    def test_missing_claim_raises(
+        self, claim, openid_like_test_idp_session, atc_default, rsa_private_key
+    ):
         """
         We require the presence of some claims. Check here that the absence
         of these raises an error.
         """
-        issuer = openid_like_test_idp[1]
-
-        atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
-        atc = AccessTokenChecker(**atc_kwargs)
+        issuer = openid_like_test_idp_session[1]
 
-        expected_claims = ["iss", "iat", "exp", "aud", "sub"]
-        for expected_claim in expected_claims:
-            print(f"Checking claim {expected_claim}")
-
-            payload = self._generate_payload(issuer)
-            if expected_claim in payload:
-                del payload[expected_claim]
+        payload = self._generate_payload(issuer)
+        del payload[claim]
 
-            token = jwt.encode(
-                payload,
-                algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
-                headers={"kid": RSA256_KEY["kid"]},
-            )
+        token = jwt.encode(
+            payload,
+            algorithm="RS256",
+            key=rsa_private_key,
+            headers={"kid": RSA256_KEY["kid"]},
+        )
 
-            with pytest.raises(jwt.exceptions.MissingRequiredClaimError):
-                atc.check_token(token=token)
+        with pytest.raises(jwt.exceptions.MissingRequiredClaimError):
+            atc_default.check_token(token=token)
 
-    def test_invalid_claim_values_raise(self, openid_like_test_idp):
+    @pytest.mark.parametrize(
+        "claim, expected_exception",
+        [
+            ("iss", jwt.exceptions.InvalidIssuerError),
+            ("aud", jwt.exceptions.InvalidAudienceError),
+            # NOTE: As of PyJWT 2.8.0 the docs state that this error should be
+            #       be named `InvalidIssuedAtError`. However interacting with
+            #       pyjwt indicates this is the actually thrown exception.
+            ("iat", jwt.exceptions.ImmatureSignatureError),
+            ("exp", jwt.exceptions.ExpiredSignatureError),
+        ],
+    )
+    def test_invalid_claim_value_raises(
+        self,
+        claim,
+        expected_exception,
+        openid_like_test_idp_session,
+        atc_default,
+        rsa_private_key,
+    ):
         """
         Check that incorrect claim values raise an error.
         """
-        issuer = openid_like_test_idp[1]
+        issuer = openid_like_test_idp_session[1]
 
+        # NOTE: Computed here and not in parametrize as the timestamps
+        #       must be relative to the time the test is executed.
+        now = int(time())
         incorrect_claim_values = {
             "iss": issuer + "/nope",
             "aud": ATC_DEFAULT_KWARGS["expected_audience"] + "-definitely-not",
-            "iat": datetime.now(tz=timezone.utc) + timedelta(seconds=60),
-            "exp": datetime.now(tz=timezone.utc) - timedelta(seconds=60),
-        }
-
-        expected_exceptions = {
-            "iss": jwt.exceptions.InvalidIssuerError,
-            "aud": jwt.exceptions.InvalidAudienceError,
-            # NOTE: As of PyJWT 2.8.0 the docs state that this error should be
-            #       be named `InvalidIssuedAtError`. However interacting with
-            #       pyjwt indicates this is the actually thrown exception.
-            "iat": jwt.exceptions.ImmatureSignatureError,
-            "exp": jwt.exceptions.ExpiredSignatureError,
+            "iat": now + 60,
+            "exp": now - 60,
         }
 
-        atc_kwargs = ATC_DEFAULT_KWARGS | {"expected_issuer": issuer}
-        atc = AccessTokenChecker(**atc_kwargs)
-
-        for claim, value in incorrect_claim_values.items():
-            print(f"Checking claim {claim} with value {value}")
-
-            payload = self._generate_payload(issuer)
-            payload[claim] = value
+        payload = self._generate_payload(issuer)
+        payload[claim] = incorrect_claim_values[claim]
 
-            token = jwt.encode(
-                payload,
-                algorithm="RS256",
-                key=RSA256_PRIVATE_KEY,
-                headers={"kid": RSA256_KEY["kid"]},
-            )
+        token = jwt.encode(
+            payload,
+            algorithm="RS256",
+            key=rsa_private_key,
+            headers={"kid": RSA256_KEY["kid"]},
+        )
 
-            with pytest.raises(expected_exceptions[claim]):
-                atc.check_token(token=token)
+        with pytest.raises(expected_exception):
+            atc_default.check_token(token=token)
 
-    def test_missing_role_claim_raises(self, openid_like_test_idp):
+    def test_missing_role_claim_raises(
+        self, openid_like_test_idp_session, atc_with_roles, rsa_private_key
+    ):
         """
         The access checker should raise an exception if an `expected_role_claim`
         is not contained in the token.
         """
-        issuer = openid_like_test_idp[1]
+        issuer = openid_like_test_idp_session[1]
         payload = self._generate_payload(issuer)
 
         token = jwt.encode(
             payload,
             algorithm="RS256",
-            key=RSA256_PRIVATE_KEY,
+            key=rsa_private_key,
             headers={"kid": RSA256_KEY["kid"]},
         )
 
-        atc_kwargs = ATC_DEFAULT_KWARGS | {
-            "expected_issuer": issuer,
-            "expected_role_claim": [
-                "resource_access",
-                "keycloak-client",
-                "roles",
-            ],
-            "expected_roles": [
-                "demo-service:permission_1",
-                "demo-service:permission_2",
-                "demo-service:permission_3",
-            ],
-        }
-        atc = AccessTokenChecker(**atc_kwargs)
         with pytest.raises(jwt.exceptions.MissingRequiredClaimError):
-            atc.check_token(token=token)
+            atc_with_roles.check_token(token=token)
 
-    def test_granted_roles_returned(self, openid_like_test_idp):
+    def test_granted_roles_returned(
+        self, openid_like_test_idp_session, atc_with_roles, rsa_private_key
+    ):
         """
         Verify that the roles that are present in the token as well as in
         `expected_roles` are returned.
         """
-        issuer = openid_like_test_idp[1]
+        issuer = openid_like_test_idp_session[1]
         payload = self._generate_payload(issuer)
         payload["resource_access"] = {
             "keycloak-client": {
@@ -351,40 +391,27 @@ class TestAccessTokenCheckerCheckToken:
         token = jwt.encode(
             payload,
             algorithm="RS256",
-            key=RSA256_PRIVATE_KEY,
+            key=rsa_private_key,
             headers={"kid": RSA256_KEY["kid"]},
         )
 
-        atc_kwargs = ATC_DEFAULT_KWARGS | {
-            "expected_issuer": issuer,
-            "expected_role_claim": [
-                "resource_access",
-                "keycloak-client",
-                "roles",
-            ],
-            "expected_roles": [
-                "demo-service:permission_1",
-                "demo-service:permission_2",
-                "demo-service:permission_3",
-            ],
-        }
-
         expected_granted_roles = [
             "demo-service:permission_1",
             "demo-service:permission_2",
         ]
 
-        atc = AccessTokenChecker(**atc_kwargs)
-        _, actual_granted_roles = atc.check_token(token=token)
+        _, actual_granted_roles = atc_with_roles.check_token(token=token)
 
         assert actual_granted_roles == expected_granted_roles
 
-    def test_granted_roles_empty_raises(self, openid_like_test_idp):
+    def test_granted_roles_empty_raises(
+        self, openid_like_test_idp_session, atc_with_roles, rsa_private_key
+    ):
         """
         If no roles are granted that is equivalent to no access at all.
         Hence we expect an exception.
         """
-        issuer = openid_like_test_idp[1]
+        issuer = openid_like_test_idp_session[1]
         payload = self._generate_payload(issuer)
         payload["resource_access"] = {
             "keycloak-client": {
@@ -397,24 +424,9 @@ class TestAccessTokenCheckerCheckToken:
         token = jwt.encode(
             payload,
             algorithm="RS256",
-            key=RSA256_PRIVATE_KEY,
+            key=rsa_private_key,
             headers={"kid": RSA256_KEY["kid"]},
         )
 
-        atc_kwargs = ATC_DEFAULT_KWARGS | {
-            "expected_issuer": issuer,
-            "expected_role_claim": [
-                "resource_access",
-                "keycloak-client",
-                "roles",
-            ],
-            "expected_roles": [
-                "demo-service:permission_1",
-                "demo-service:permission_2",
-                "demo-service:permission_3",
-            ],
-        }
-
-        atc = AccessTokenChecker(**atc_kwargs)
         with pytest.raises(jwt.exceptions.InvalidTokenError):
-            atc.check_token(token=token)
+            atc_with_roles.check_token(token=token)
@@ -17,9 +17,6 @@ SPDX-FileCopyrightText: 2024 FZI Research Center for Information Technology
 SPDX-License-Identifier: Apache-2.0
 """
 
-from datetime import datetime
-from datetime import timezone
-
 import pytest
 
 try:
@@ -35,6 +32,20 @@ from esg.utils.pandas import value_message_list_from_series
 from esg.utils.pandas import dataframe_from_value_dataframe
 from esg.utils.pandas import value_dataframe_from_dataframe
 
+pytestmark = pytest.mark.unit
+
+
+if pd is not None:
+    # Shared by the fixtures below, pandas indexes are immutable.
+    TEST_INDEX = pd.DatetimeIndex(
+        [
+            "2022-02-22T02:52:00Z",
+            "2022-02-22T02:53:00Z",
+            "2022-02-22T02:54:00Z",
+        ],
+        tz="UTC",
+    )
+
 
 @pytest.fixture(scope="class")
 def add_test_data(request):
@@ -45,62 +56,48 @@ def add_test_data(request):
     float: Values contain only float values.
     """
     request.cls.value_msg_series = pd.Series(
-        index=[
-            datetime(2022, 2, 22, 2, 52, tzinfo=timezone.utc),
-            datetime(2022, 2, 22, 2, 53, tzinfo=timezone.utc),
-            datetime(2022, 2, 22, 2, 54, tzinfo=timezone.utc),
-        ],
+        index=TEST_INDEX,
         data=[2.1, None, -2.3],
     )
-    request.cls.value_msg_list_jsonable = [
-        {
-            "value": 2.1,
-            "time": "2022-02-22T02:52:00Z",
-        },
-        {
-            "value": None,
-            "time": "2022-02-22T02:53:00Z",
-        },
-        {
-            "value": -2.3,
-            "time": "2022-02-22T02:54:00Z",
-        },
-    ]
+
+
+@pytest.fixture(scope="session")
+def value_msg_list_model():
+    """
+    The value messages matching `value_msg_series` of `add_test_data`.
+    """
+    return ValueMessageList(
+        [
+            {"value": 2.1, "time": "2022-02-22T02:52:00Z"},
+            {"value": None, "time": "2022-02-22T02:53:00Z"},
+            {"value": -2.3, "time": "2022-02-22T02:54:00Z"},
+        ]
+    )
 
 
 @pytest.mark.usefixtures("add_test_data")
 @pytest.mark.skipif(pd is None, reason="requires pandas")
 class TestSeriesFromValueList:
-    def test_series_parsed_correctly(self):
+    def test_series_parsed_correctly(self, value_msg_list_model):
         """
         Check that float only value message lists are parsed as float correctly.
         """
         expected_series = self.value_msg_series
-        value_msg_list = ValueMessageList(self.value_msg_list_jsonable)
 
-        actual_series = series_from_value_message_list(value_msg_list)
+        actual_series = series_from_value_message_list(value_msg_list_model)
 
-        # NOTE: The `check_index_type` is used here as pandas else complains:
-        # E       Attribute "dtype" are different
-        # E       [left]:  datetime64[ns, UTC]
-        # E       [right]: datetime64[ns, UTC]
-        # Which doesn't seem to be different at all?
-        pd.testing.assert_series_equal(
-            actual_series, expected_series, check_index_type=False
-        )
+        pd.testing.assert_series_equal(actual_series, expected_series)
 
 
 @pytest.mark.usefixtures("add_test_data")
 @pytest.mark.skipif(pd is None, reason="requires pandas")
 class TestValueListFromSeries:
-    def test_value_message_list_created_correctly(self):
+    def test_value_message_list_created_correctly(self, value_msg_list_model):
         """
         Verify that value message list is created correctly for series
         holding floats as values incl. a NaN.
         """
-        expected_value_message_list = ValueMessageList(
-            self.value_msg_list_jsonable
-        )
+        expected_value_message_list = value_msg_list_model
 
         actual_value_message_list = value_message_list_from_series(
             self.value_msg_series
@@ -112,11 +109,7 @@ class TestValueListFromSeries:
 @pytest.fixture(scope="class")
 def add_test_dataframe(request):
     request.cls.test_data_as_pandas = pd.DataFrame(
-        index=[
-            datetime(2022, 2, 22, 2, 52, tzinfo=timezone.utc),
-            datetime(2022, 2, 22, 2, 53, tzinfo=timezone.utc),
-            datetime(2022, 2, 22, 2, 54, tzinfo=timezone.utc),
-        ],
+        index=TEST_INDEX,
         data={
             # Ints incl. a NaN
             "1": [1, 2, None],
@@ -137,10 +130,28 @@ def add_test_dataframe(request):
     }
 
 
+@pytest.fixture(scope="session")
+def value_dataframe_model():
+    """
+    `test_data_as_jsonable` of `add_test_dataframe` as parsed model.
+    """
+    return ValueDataFrame(
+        times=[
+            "2022-02-22T02:52:00Z",
+            "2022-02-22T02:53:00Z",
+            "2022-02-22T02:54:00Z",
+        ],
+        values={
+            "1": [1.0, 2.0, None],
+            "23": [2.1, None, -2.3],
+        },
+    )
+
+
 @pytest.mark.usefixtures("add_test_dataframe")
 @pytest.mark.skipif(pd is None, reason="requires pandas")
 class TestDataframeFromValueDataframe:
-    def test_dataframe_parsed_correctly(self):
+    def test_dataframe_parsed_correctly(self, value_dataframe_model):
         """
         Check that the a pandas DataFrame is correctly parsed from pydantic
         input.
@@ -148,17 +159,10 @@ class TestDataframeFromValueDataframe:
         expected_dataframe = self.test_data_as_pandas
 
         actual_dataframe = dataframe_from_value_dataframe(
-            ValueDataFrame(**self.test_data_as_jsonable)
+            value_dataframe_model
         )
 
-        # NOTE: The `check_index_type` is used here as pandas else complains:
-        # E       Attribute "dtype" are different
-        # E       [left]:  datetime64[ns, UTC]
-        # E       [right]: datetime64[ns, UTC]
-        # Which doesn't seem to be different at all?
-        pd.testing.assert_frame_equal(
-            actual_dataframe, expected_dataframe, check_index_type=False
-        )
+        pd.testing.assert_frame_equal(actual_dataframe, expected_dataframe)
 
 
 @pytest.mark.usefixtures("add_test_dataframe")
@@ -20,8 +20,12 @@ SPDX-License-Identifier: Apache-2.0
 from datetime import datetime
 from datetime import timezone
 
+import pytest
+
 from esg.utils.timestamp import datetime_from_timestamp, datetime_to_pretty_str
 
+pytestmark = pytest.mark.unit
+
 
 class TestDatetimeFromTimestamp:
     def test_datetime_value_correct(self):